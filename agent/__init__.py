@@ -6,19 +6,41 @@ A LangChain-based agent that summarizes webpages using Google's Gemini API.
 
 This package provides tools for webpage content extraction, summarization,
 conversation memory, and a FastAPI interface.
+
+Public names are resolved lazily so that ``import agent`` does not pull in
+LangChain, the Gemini client or BeautifulSoup until they are actually used.
 """
 
-from .browser import WebBrowserTool
-from .memory import SummarizerMemory
-from .summarizer import WebpageSummarizer
-from .prompts import (
-    SUMMARIZATION_PROMPT,
-    AGENT_PROMPT,
-    ENHANCED_SUMMARIZATION_PROMPT,
-    ENHANCED_AGENT_PROMPT,
-    TOPIC_EXTRACTION_PROMPT,
-    RELEVANCE_SCORING_PROMPT
-)
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .browser import WebBrowserTool
+    from .memory import SummarizerMemory
+    from .summarizer import WebpageSummarizer
+    from .prompts import (
+        SUMMARIZATION_PROMPT,
+        AGENT_PROMPT,
+        ENHANCED_SUMMARIZATION_PROMPT,
+        ENHANCED_AGENT_PROMPT,
+        TOPIC_EXTRACTION_PROMPT,
+        RELEVANCE_SCORING_PROMPT,
+        UPDATE_SUMMARIZATION_PROMPT
+    )
+
+# Maps each public name to the submodule that defines it
+_LAZY_ATTRIBUTES = {
+    'WebBrowserTool': '.browser',
+    'SummarizerMemory': '.memory',
+    'WebpageSummarizer': '.summarizer',
+    'SUMMARIZATION_PROMPT': '.prompts',
+    'AGENT_PROMPT': '.prompts',
+    'ENHANCED_SUMMARIZATION_PROMPT': '.prompts',
+    'ENHANCED_AGENT_PROMPT': '.prompts',
+    'TOPIC_EXTRACTION_PROMPT': '.prompts',
+    'RELEVANCE_SCORING_PROMPT': '.prompts',
+    'UPDATE_SUMMARIZATION_PROMPT': '.prompts',
+}
 
 __all__ = [
     'WebBrowserTool',
@@ -29,7 +51,22 @@ __all__ = [
     'ENHANCED_SUMMARIZATION_PROMPT',
     'ENHANCED_AGENT_PROMPT',
     'TOPIC_EXTRACTION_PROMPT',
-    'RELEVANCE_SCORING_PROMPT'
+    'RELEVANCE_SCORING_PROMPT',
+    'UPDATE_SUMMARIZATION_PROMPT'
 ]
 
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule defining ``name`` on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
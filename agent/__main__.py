@@ -0,0 +1,9 @@
+"""
+Entry point for ``python -m agent`` (bulk summarization CLI).
+"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -3,71 +3,122 @@ WebBrowserTool for fetching and extracting web content.
 This module handles webpage access and content extraction.
 """
 
-from typing import Dict, List, Optional, Any
+import re
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
 from langchain.tools import BaseTool
 import httpx
-from bs4 import BeautifulSoup
+
+from .embedded import extract_embedded_text
+from .tokens import MAX_PAGE_TOKENS, truncate_to_tokens
+from .tracing import span, url_host
+
+if TYPE_CHECKING:
+    from .prefetch import Link
 
 class WebBrowserTool(BaseTool):
     """Tool for browsing websites and extracting their content."""
-    
+
     # Add type annotations to these class attributes to fix the Pydantic error
     name: str = "web_browser"
     description: str = "Useful for fetching and extracting content from a webpage given its URL."
-    
-    def _run(self, url: str) -> str:
-        """Use the tool with a URL."""
-        try:
-            # Basic validation
-            if not url.startswith(('http://', 'https://')):
-                return "Error: URL must start with http:// or https://"
-            
-            # Fetch the webpage
-            response = httpx.get(url, follow_redirects=True, timeout=10.0)
-            response.raise_for_status()
-            
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
+    max_page_tokens: int = MAX_PAGE_TOKENS
+    # Optional agent.prefetch.FetchCache holding speculatively fetched pages
+    fetch_cache: Optional[Any] = None
+
+    def _extract_page(self, html: str, base_url: Optional[str] = None) -> Tuple[str, List["Link"]]:
+        """Extract readable text, and the outbound links if ``base_url`` is given, from an HTML document."""
+        with span("browser.extract", {"html.bytes": len(html)}) as s:
+            # Parse with BeautifulSoup (imported lazily to keep startup fast)
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(html, 'html.parser')
+
+            links = []
+            if base_url:
+                from .prefetch import collect_links
+                links = collect_links(soup, base_url)
+
+            # Pull text out of JSON-LD, OpenGraph and hydration data before scripts are removed
+            embedded = extract_embedded_text(soup, max_chars=self.max_page_tokens * 4)
+
             # Extract main content (remove scripts, styles, etc.)
             for script in soup(["script", "style", "meta", "noscript", "iframe"]):
                 script.extract()
-                
+
             # Get text
             text = soup.get_text(separator=' ', strip=True)
-            
+
+            # JavaScript-rendered pages carry more content in embedded data than in markup
+            from_embedded = len(embedded) > len(text)
+            if from_embedded:
+                text = f"{embedded} {text}"
+
             # Clean up excessive whitespace
-            import re
             text = re.sub(r'\s+', ' ', text).strip()
-            
-            # Truncate if too long
-            if len(text) > 50000:
-                text = text[:50000] + "...[content truncated due to length]"
-                
-            return text
+
+            # Truncate if too long (model-specific budgets are applied later)
+            limited = truncate_to_tokens(text, self.max_page_tokens)
+            truncated = limited is not text
+            text = limited
+
+            s.set_attributes({
+                "text.chars": len(text),
+                "text.truncated": truncated,
+                "text.embedded": from_embedded,
+                "links": len(links),
+            })
+            return text, links
+
+    def _extract_text(self, html: str) -> str:
+        """Extract readable text from an HTML document."""
+        return self._extract_page(html)[0]
+
+    def _fetch_page(self, url: str, with_links: bool = False) -> Tuple[str, List["Link"]]:
+        """Fetch a URL and return its text (or an error message) and, if requested, its links."""
+        try:
+            # Basic validation
+            if not url.startswith(('http://', 'https://')):
+                return "Error: URL must start with http:// or https://", []
+
+            # Fetch the webpage, unless it was prefetched
+            with span("browser.fetch", {"url.host": url_host(url)}) as s:
+                cached = self.fetch_cache.get(url) if self.fetch_cache is not None else None
+                s.set_attribute("browser.cache_hit", cached is not None)
+                if cached is not None:
+                    return cached
+
+                response = httpx.get(url, follow_redirects=True, timeout=10.0)
+                s.set_attributes({
+                    "http.status_code": response.status_code,
+                    "http.response.body.size": len(response.content),
+                })
+                response.raise_for_status()
+
+            return self._extract_page(response.text, str(response.url) if with_links else None)
         except Exception as e:
-            return f"Error accessing URL: {str(e)}"
-    
+            return f"Error accessing URL: {str(e)}", []
+
+    def _run(self, url: str) -> str:
+        """Use the tool with a URL."""
+        return self._fetch_page(url)[0]
+
+    async def _afetch(self, client: httpx.AsyncClient, url: str) -> str:
+        """Fetch the HTML of a URL using a (possibly shared) async client."""
+        with span("browser.fetch", {"url.host": url_host(url)}) as s:
+            response = await client.get(url, follow_redirects=True, timeout=10.0)
+            s.set_attributes({
+                "http.status_code": response.status_code,
+                "http.response.body.size": len(response.content),
+            })
+            response.raise_for_status()
+            return response.text
+
     async def _arun(self, url: str) -> str:
         """Async version of run."""
         try:
             async with httpx.AsyncClient() as client:
-                response = await client.get(url, follow_redirects=True, timeout=10.0)
-                response.raise_for_status()
-                
-                # Process with BeautifulSoup (same as _run)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                for script in soup(["script", "style", "meta", "noscript", "iframe"]):
-                    script.extract()
-                    
-                text = soup.get_text(separator=' ', strip=True)
-                import re
-                text = re.sub(r'\s+', ' ', text).strip()
-                
-                if len(text) > 50000:
-                    text = text[:50000] + "...[content truncated due to length]"
-                    
-                return text
+                html = await self._afetch(client, url)
+
+            # Process with BeautifulSoup (same as _run)
+            return self._extract_text(html)
         except Exception as e:
-            return f"Error accessing URL: {str(e)}"
\ No newline at end of file
+            return f"Error accessing URL: {str(e)}"
@@ -0,0 +1,268 @@
+"""
+Command-line interface for bulk offline summarization.
+
+Reads URLs from a file or stdin (one URL per line, or JSON lines with a
+"url" field), fetches and summarizes them through a concurrent async
+pipeline, and appends one JSON result per line to an output file that also
+serves as the resume checkpoint.
+
+Usage:
+    python -m agent urls.txt -o summaries.jsonl --fetch-concurrency 16 --llm-concurrency 4
+    cat urls.jsonl | python -m agent - -o summaries.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, TextIO
+
+_URL_PATTERN = re.compile(r'https?://[^\s"\'<>]+')
+
+
+def read_urls(lines: Iterable[str]) -> List[str]:
+    """Collect unique URLs from plain-text or JSON lines, preserving their order."""
+    seen: Set[str] = set()
+    urls = []
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        url = None
+        if line.startswith('{'):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                url = record.get("url")
+                if not isinstance(url, str):
+                    # Fall back to the first URL mentioned in any string field
+                    text = " ".join(v for v in record.values() if isinstance(v, str))
+                    match = _URL_PATTERN.search(text)
+                    url = match.group(0) if match else None
+        else:
+            match = _URL_PATTERN.match(line)
+            url = match.group(0) if match else None
+
+        if url and url not in seen:
+            seen.add(url)
+            urls.append(url)
+
+    return urls
+
+
+def load_checkpoint(path: str, retry_errors: bool = False) -> Set[str]:
+    """Return the URLs that already have a final result in the output file (degraded ones are retried)."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A partially written last line from a crash
+                continue
+            if "url" in record and not record.get("degraded") and not (retry_errors and "error" in record):
+                done.add(record["url"])
+
+    return done
+
+
+class Progress:
+    """Tracks completed URLs and renders a throughput/ETA status line."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def update(self, ok: bool) -> None:
+        """Record one finished URL."""
+        self.done += 1
+        if not ok:
+            self.errors += 1
+
+    def render(self) -> str:
+        """Return the current status line."""
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        if rate > 0:
+            eta = time.strftime("%H:%M:%S", time.gmtime((self.total - self.done) / rate))
+        else:
+            eta = "--:--:--"
+        return (f"{self.done}/{self.total} done, {self.errors} errors, "
+                f"{rate:.2f} URLs/s, ETA {eta}")
+
+
+async def run_batch(
+    summarizer: Any,
+    urls: List[str],
+    output: TextIO,
+    fetch_concurrency: int = 16,
+    llm_concurrency: int = 4,
+    status_stream: Optional[TextIO] = sys.stderr,
+    status_interval: float = 1.0
+) -> Progress:
+    """
+    Fetch and summarize ``urls``, writing one JSON line per URL to ``output``.
+
+    Fetch workers share one HTTP client and hand extracted text to a bounded
+    queue; LLM workers summarize it in a thread pool so the event loop is
+    never blocked. Results are flushed as soon as they are ready.
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    browser = summarizer.browser_tool
+    progress = Progress(len(urls))
+
+    url_queue: asyncio.Queue = asyncio.Queue()
+    for url in urls:
+        url_queue.put_nowait(url)
+    content_queue: asyncio.Queue = asyncio.Queue(maxsize=llm_concurrency * 2)
+
+    parse_executor = ThreadPoolExecutor(max_workers=max(1, min(4, fetch_concurrency)))
+    llm_executor = ThreadPoolExecutor(max_workers=llm_concurrency)
+
+    def write(record: Dict[str, Any]) -> None:
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+        progress.update("error" not in record)
+
+    async def fetch_worker(client: httpx.AsyncClient) -> None:
+        while True:
+            try:
+                url = url_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.monotonic()
+            try:
+                html = await browser._afetch(client, url)
+                content = await loop.run_in_executor(parse_executor, browser._extract_text, html)
+            except Exception as e:
+                write({"url": url, "error": f"Error accessing URL: {str(e)}"})
+                continue
+            await content_queue.put((url, content, started))
+
+    async def summarize_worker() -> None:
+        while True:
+            item = await content_queue.get()
+            if item is None:
+                return
+            url, content, started = item
+            result = await loop.run_in_executor(llm_executor, summarizer.summarize_content, url, content)
+            record = {"url": url, **result}
+            record["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+            write(record)
+
+    async def report_status() -> None:
+        while True:
+            status_stream.write("\r" + progress.render())
+            status_stream.flush()
+            await asyncio.sleep(status_interval)
+
+    reporter = asyncio.create_task(report_status()) if status_stream else None
+    limits = httpx.Limits(max_connections=fetch_concurrency)
+    try:
+        async with httpx.AsyncClient(limits=limits) as client:
+            summarizers = [asyncio.create_task(summarize_worker()) for _ in range(llm_concurrency)]
+            await asyncio.gather(*(fetch_worker(client) for _ in range(fetch_concurrency)))
+            for _ in summarizers:
+                await content_queue.put(None)
+            await asyncio.gather(*summarizers)
+    finally:
+        if reporter:
+            reporter.cancel()
+            status_stream.write("\r" + progress.render() + "\n")
+            status_stream.flush()
+        parse_executor.shutdown(wait=False)
+        llm_executor.shutdown(wait=False)
+
+    return progress
+
+
+def _ensure_trailing_newline(path: str) -> None:
+    """Terminate a partially written last line so appended records stay valid JSONL."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the bulk summarization CLI and return a process exit code."""
+    parser = argparse.ArgumentParser(
+        prog="python -m agent",
+        description="Summarize many webpages concurrently and write the results as JSON lines."
+    )
+    parser.add_argument("input", help="file with URLs (plain lines or JSON lines with a 'url' field), or '-' for stdin")
+    parser.add_argument("-o", "--output", default="summaries.jsonl", help="JSONL results file, also used to resume")
+    parser.add_argument("--fetch-concurrency", type=int, default=16, help="concurrent page fetches")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="concurrent LLM summarizations")
+    parser.add_argument("--retry-errors", action="store_true", help="re-process URLs whose previous result was an error")
+    parser.add_argument("--no-resume", action="store_true", help="overwrite the output file instead of resuming")
+    args = parser.parse_args(argv)
+
+    if args.fetch_concurrency < 1 or args.llm_concurrency < 1:
+        parser.error("concurrency values must be at least 1")
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        print("Error: GOOGLE_API_KEY environment variable is not set", file=sys.stderr)
+        return 2
+
+    if args.input == "-":
+        urls = read_urls(sys.stdin)
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            urls = read_urls(f)
+
+    done = set() if args.no_resume else load_checkpoint(args.output, args.retry_errors)
+    pending = [url for url in urls if url not in done]
+    print(f"{len(urls)} URLs, {len(urls) - len(pending)} already done, {len(pending)} to process",
+          file=sys.stderr)
+    if not pending:
+        return 0
+
+    from .config import summarizer_config_from_env
+    from .summarizer import WebpageSummarizer
+    from .tracing import configure_tracing
+
+    configure_tracing()
+    # A backfill wants final LLM summaries, not extractive placeholders, so no deadline
+    config = summarizer_config_from_env()
+    config["llm_deadline"] = None
+    summarizer = WebpageSummarizer(api_key=api_key, **config)
+
+    if not args.no_resume:
+        _ensure_trailing_newline(args.output)
+
+    try:
+        with open(args.output, "w" if args.no_resume else "a", encoding="utf-8") as output:
+            progress = asyncio.run(run_batch(
+                summarizer,
+                pending,
+                output,
+                fetch_concurrency=args.fetch_concurrency,
+                llm_concurrency=args.llm_concurrency
+            ))
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume.", file=sys.stderr)
+        return 130
+
+    return 1 if progress.errors else 0
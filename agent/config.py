@@ -0,0 +1,82 @@
+"""
+Environment-based configuration shared by the API server and the CLI.
+"""
+
+import os
+from typing import Any, Dict
+
+
+
+def summarizer_config_from_env() -> Dict[str, Any]:
+    """
+    Return ``WebpageSummarizer`` keyword arguments read from environment variables.
+
+    Optional feature modules are only imported when their variables enable them.
+    """
+    # Get optional model name or use default
+    model_name = os.getenv("MODEL_NAME", "gemini-1.5-pro")
+
+    # Smaller model used on overload and for short pages (empty FALLBACK_MODEL disables it)
+    fallback_model = os.getenv("FALLBACK_MODEL", "gemini-1.5-flash") or None
+
+    # Optional incremental re-summarization for frequently refreshed pages
+    section_cache_dir = os.getenv("SECTION_CACHE_DIR")
+
+    # Optional near-duplicate detection across URLs
+    dedup_index_path = os.getenv("DEDUP_INDEX_PATH")
+    dedup_max_distance = int(os.getenv("DEDUP_MAX_DISTANCE", "3"))
+    dedup_max_entries = int(os.getenv("DEDUP_MAX_ENTRIES", "100000"))
+
+    # Optional latency budget after which a local extractive summary is returned
+    llm_deadline = os.getenv("LLM_DEADLINE_SECONDS")
+
+    # Optional background prefetch of the most promising links of each summarized page
+    prefetch_links = int(os.getenv("PREFETCH_LINKS", "0"))
+
+    section_store = None
+    if section_cache_dir:
+        from .incremental import SectionStore
+        section_store = SectionStore(section_cache_dir)
+
+    dedup_index = None
+    if dedup_index_path:
+        from .dedup import FingerprintIndex
+        dedup_index = FingerprintIndex(
+            dedup_index_path, max_distance=dedup_max_distance, max_entries=dedup_max_entries
+        )
+
+    prefetcher = None
+    if prefetch_links > 0:
+        from .prefetch import FetchCache, LinkPrefetcher
+        prefetcher = LinkPrefetcher(
+            cache=FetchCache(
+                max_bytes=int(os.getenv("PREFETCH_CACHE_BYTES", str(32 * 1024 * 1024))),
+                ttl=float(os.getenv("PREFETCH_TTL_SECONDS", "300"))
+            ),
+            max_links=prefetch_links,
+            concurrency=int(os.getenv("PREFETCH_CONCURRENCY", "2")),
+            max_page_bytes=int(os.getenv("PREFETCH_MAX_PAGE_BYTES", str(2 * 1024 * 1024))),
+            max_batch_bytes=int(os.getenv("PREFETCH_MAX_BATCH_BYTES", str(8 * 1024 * 1024)))
+        )
+
+    return {
+        # Per-task model routing: the large model writes summaries, a fast tier handles the rest
+        "model": os.getenv("SUMMARY_MODEL", model_name),
+        "task_models": {
+            "topic": os.getenv("TOPIC_MODEL", "gemini-1.5-flash"),
+            "relevance": os.getenv("RELEVANCE_MODEL", "gemini-1.5-flash"),
+            "qa": os.getenv("QA_MODEL", "gemini-1.5-flash"),
+        },
+        "fallback_model": fallback_model,
+        "short_page_chars": int(os.getenv("SHORT_PAGE_CHARS", "4000")),
+        # Cap on prompt size below the models' context windows (0 = use the full window)
+        "max_prompt_tokens": int(os.getenv("MAX_PROMPT_TOKENS", "8000")) or None,
+        "section_store": section_store,
+        "min_change_ratio": float(os.getenv("MIN_CHANGE_RATIO", "0.02")),
+        "dedup_index": dedup_index,
+        "llm_deadline": float(llm_deadline) if llm_deadline else None,
+        "quota_cooldown": float(os.getenv("QUOTA_COOLDOWN_SECONDS", "60")),
+        "llm_workers": int(os.getenv("LLM_WORKERS", "4")),
+        "llm_queue_size": int(os.getenv("LLM_QUEUE_SIZE", "16")),
+        "prefetcher": prefetcher,
+    }
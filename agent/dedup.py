@@ -0,0 +1,231 @@
+"""
+Near-duplicate page detection.
+Canonicalizes URLs and keeps a SimHash fingerprint index over extracted page
+text, so syndicated copies, mirrors and tracking-parameter variants of an
+already summarized page can reuse its summary.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only identify campaigns, clicks or sessions
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src", "spm", "cmpid", "ocid",
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+# Pages with fewer words than this are too short to fingerprint reliably
+MIN_FINGERPRINT_WORDS = 50
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different variants compare equal.
+
+    Lowercases the scheme and host, drops ``www.``, default ports, fragments,
+    trailing slashes and tracking parameters, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def simhash(text: str, shingle_size: int = 3) -> Optional[int]:
+    """Return a 64-bit SimHash of word shingles in ``text``, or None if it is too short."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < MIN_FINGERPRINT_WORDS:
+        return None
+
+    shingles = Counter(
+        " ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)
+    )
+
+    weights = [0] * 64
+    for shingle, count in shingles.items():
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            if h >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Return the number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class FingerprintIndex:
+    """
+    Array-backed SimHash index of summarized pages.
+
+    Fingerprints live in an ``array('Q')`` and are bucketed by four 16-bit
+    bands, so any fingerprint within 3 bits of a query shares at least one
+    band and is found without a full scan. With a ``path``, each page is
+    appended to ``<path>.jsonl`` as one record holding its fingerprint and
+    summary, written in a single ``write`` so processes sharing the file
+    (several API workers, or the CLI beside the API) cannot mix up pairs;
+    the file is reloaded on start.
+
+    Each URL keeps only its latest entry, and beyond ``max_entries`` the
+    oldest pages are evicted. Replaced and evicted entries stay in place as
+    dead slots until they outnumber the live ones; the index and its files
+    are then compacted.
+    """
+
+    BANDS = 4
+    BAND_BITS = 16
+
+    def __init__(self, path: Optional[str] = None, max_distance: int = 3, max_entries: int = 100_000):
+        """Create an index, loading any persisted entries from ``path``."""
+        self.path = path
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.fingerprints = array('Q')
+        self.entries: List[Optional[Dict[str, str]]] = []
+        self._positions: Dict[str, int] = {}
+        self._dead = 0
+        self._bands: List[Dict[int, array]] = [{} for _ in range(self.BANDS)]
+        self._lock = threading.Lock()
+
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self.fingerprints) - self._dead
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.BAND_BITS) - 1
+        return [(fingerprint >> (band * self.BAND_BITS)) & mask for band in range(self.BANDS)]
+
+    def _insert(self, fingerprint: int, entry: Dict[str, str]) -> None:
+        previous = self._positions.pop(entry["url"], None)
+        if previous is not None:
+            self._discard(previous)
+
+        position = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        self.entries.append(entry)
+        self._positions[entry["url"]] = position
+        for band, value in enumerate(self._band_values(fingerprint)):
+            self._bands[band].setdefault(value, array('I')).append(position)
+
+        # Positions are ordered by insertion, so the first one is the oldest page
+        while len(self) > self.max_entries:
+            self._discard(self._positions.pop(next(iter(self._positions))))
+
+    def _discard(self, position: int) -> None:
+        self.entries[position] = None
+        self._dead += 1
+
+    def _compact(self) -> None:
+        """Drop dead slots, rebuild the bands and rewrite the files without them."""
+        live = [(fingerprint, entry) for fingerprint, entry in zip(self.fingerprints, self.entries) if entry]
+        self.fingerprints = array('Q')
+        self.entries = []
+        self._positions = {}
+        self._dead = 0
+        self._bands = [{} for _ in range(self.BANDS)]
+        for fingerprint, entry in live:
+            self._insert(fingerprint, entry)
+        if self.path:
+            self._rewrite()
+
+    @staticmethod
+    def _record(fingerprint: int, entry: Dict[str, str]) -> bytes:
+        return (json.dumps({"fingerprint": f"{fingerprint:016x}", **entry}, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def _rewrite(self) -> None:
+        # Replaced atomically so a concurrent reader never sees a half-written file
+        temporary = f"{self.path}.jsonl.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            for fingerprint, entry in zip(self.fingerprints, self.entries):
+                if entry is not None:
+                    f.write(self._record(fingerprint, entry))
+        os.replace(temporary, f"{self.path}.jsonl")
+
+    def _load(self) -> None:
+        clean = True
+        try:
+            with open(f"{self.path}.jsonl", "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        fingerprint = int(record.pop("fingerprint"), 16)
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        # A partially written line, or one from the old two-file format
+                        clean = False
+                        continue
+                    self._insert(fingerprint, record)
+        except OSError:
+            return
+
+        if self._dead:
+            self._compact()
+        elif not clean:
+            self._rewrite()
+
+    def _candidates(self, fingerprint: int) -> List[int]:
+        if self.max_distance >= self.BANDS:
+            return list(range(len(self.fingerprints)))
+        positions = set()
+        for band, value in enumerate(self._band_values(fingerprint)):
+            positions.update(self._bands[band].get(value, ()))
+        return list(positions)
+
+    def lookup(self, fingerprint: int) -> Optional[Tuple[Dict[str, str], int]]:
+        """Return ``(entry, distance)`` for the closest fingerprint within ``max_distance``."""
+        best = None
+        with self._lock:
+            for position in self._candidates(fingerprint):
+                if self.entries[position] is None:
+                    continue
+                distance = hamming_distance(fingerprint, self.fingerprints[position])
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (self.entries[position], distance)
+        return best
+
+    def add(self, fingerprint: int, url: str, summary: str, main_topic: str) -> None:
+        """Record a summarized page under its fingerprint, replacing any earlier entry for ``url``."""
+        entry = {"url": url, "summary": summary, "main_topic": main_topic}
+        with self._lock:
+            self._insert(fingerprint, entry)
+            if self._dead > len(self):
+                self._compact()
+            elif self.path:
+                # Unbuffered, so the whole record goes out in one append
+                with open(f"{self.path}.jsonl", "ab", buffering=0) as f:
+                    f.write(self._record(fingerprint, entry))
@@ -0,0 +1,105 @@
+"""
+Graceful degradation for when the LLM is slow or over quota.
+Provides a fast local extractive summary (TextRank over sentences) with a
+keyword-derived topic, and a quota gate that stops sending requests to a
+rate-limited provider for a cooldown period.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import List
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+_WORD_PATTERN = re.compile(r"[a-zA-Z][a-zA-Z'-]+")
+
+# Sentences considered for ranking; TextRank is quadratic in this number
+MAX_RANKED_SENTENCES = 200
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further had
+has have having he her here hers herself him himself his how i if in into is it its itself just
+me more most my myself no nor not now of off on once only or other our ours ourselves out over
+own same she should so some such than that the their theirs them themselves then there these
+they this those through to too under until up very was we were what when where which while who
+whom why will with would you your yours yourself yourselves one two new may might must said says
+like get got us via per within without across around among upon
+""".split())
+
+
+def _sentence_words(sentence: str) -> List[str]:
+    return [w for w in (m.lower() for m in _WORD_PATTERN.findall(sentence)) if w not in STOPWORDS]
+
+
+def extractive_summary(text: str, max_sentences: int = 5) -> str:
+    """
+    Return the ``max_sentences`` most central sentences of ``text`` in original order.
+
+    Sentences are ranked with TextRank: a graph whose edge weights are word
+    overlap normalized by sentence length, scored by power iteration.
+    """
+    sentences = [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if len(s.strip()) > 30]
+    sentences = sentences[:MAX_RANKED_SENTENCES]
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences) if sentences else text[:1000]
+
+    word_sets = [set(_sentence_words(s)) for s in sentences]
+    n = len(sentences)
+
+    # Weighted adjacency lists
+    edges: List[List[tuple]] = [[] for _ in range(n)]
+    for i in range(n):
+        if len(word_sets[i]) < 2:
+            continue
+        for j in range(i + 1, n):
+            if len(word_sets[j]) < 2:
+                continue
+            overlap = len(word_sets[i] & word_sets[j])
+            if overlap:
+                weight = overlap / (math.log(len(word_sets[i])) + math.log(len(word_sets[j])))
+                edges[i].append((j, weight))
+                edges[j].append((i, weight))
+    out_weight = [sum(w for _, w in edges[i]) or 1.0 for i in range(n)]
+
+    damping = 0.85
+    scores = [1.0 / n] * n
+    for _ in range(30):
+        scores = [
+            (1 - damping) / n + damping * sum(scores[j] * w / out_weight[j] for j, w in edges[i])
+            for i in range(n)
+        ]
+
+    top = sorted(range(n), key=lambda i: scores[i], reverse=True)[:max_sentences]
+    return " ".join(sentences[i] for i in sorted(top))
+
+
+def keyword_topic(text: str, max_words: int = 3) -> str:
+    """Return a short topic built from the most frequent content words of ``text``."""
+    counts = Counter(w for w in _sentence_words(text) if len(w) > 3)
+    words = [word for word, _ in counts.most_common(max_words)]
+    return " ".join(word.capitalize() for word in words) or "Unknown"
+
+
+class QuotaGate:
+    """Circuit breaker that stays open for a cooldown after a quota or overload error."""
+
+    def __init__(self, cooldown: float = 60.0):
+        self.cooldown = cooldown
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def trip(self) -> None:
+        """Block LLM calls for the next ``cooldown`` seconds."""
+        with self._lock:
+            self._open_until = time.monotonic() + self.cooldown
+
+    def remaining(self) -> float:
+        """Seconds until LLM calls are allowed again (0 when allowed)."""
+        return max(0.0, self._open_until - time.monotonic())
+
+    def is_open(self) -> bool:
+        """Return True while LLM calls should be skipped."""
+        return self.remaining() > 0
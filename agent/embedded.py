@@ -0,0 +1,154 @@
+"""
+Text extraction from data embedded in HTML.
+Many JavaScript-rendered pages ship little visible text but carry their
+content in JSON-LD, OpenGraph tags or framework hydration payloads such as
+``__NEXT_DATA__``. This module pulls readable text out of those so a page
+can be summarized from a single fetch without a browser engine.
+"""
+
+import html
+import itertools
+import json
+import re
+from typing import Any, Iterator, List, Optional
+
+# Inline scripts that hold JSON hydration state, by element id
+HYDRATION_SCRIPT_IDS = ("__NEXT_DATA__", "__NUXT_DATA__", "__APOLLO_STATE__", "__remixContext")
+
+# JavaScript globals that frameworks assign their initial state to
+HYDRATION_GLOBALS = re.compile(
+    r'(?:window\.)?(__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__|__NUXT__|__remixContext'
+    r'|__INITIAL_DATA__|__DATA__)\s*=\s*'
+)
+
+# Keys whose string values are content even when short
+TEXT_KEYS = frozenset({
+    "headline", "alternativeHeadline", "title", "description", "abstract", "articleBody",
+    "text", "reviewBody", "body", "content", "summary", "excerpt", "subtitle",
+})
+
+# Keys whose values are identifiers, markup or media rather than text
+SKIP_KEYS = frozenset({
+    "@context", "@id", "@type", "url", "image", "logo", "thumbnailUrl", "href", "src", "srcset",
+    "className", "class", "style", "css", "id", "key", "slug", "path", "asPath", "query",
+    "buildId", "locale", "locales", "__typename", "contentType", "mimeType", "icon", "scripts",
+})
+
+# Meta tags with page-level descriptions, in order of preference
+META_TEXT_NAMES = ("og:title", "twitter:title", "og:description", "twitter:description", "description")
+
+# Strings need this many words to count as prose outside TEXT_KEYS
+MIN_PROSE_WORDS = 8
+
+# Stop walking huge payloads after this many JSON nodes
+MAX_JSON_NODES = 50_000
+
+# Upper bound on distinct strings collected from one page
+MAX_EMBEDDED_STRINGS = 2_000
+
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_SPACE_PATTERN = re.compile(r'\s+')
+
+
+def _clean(value: str) -> str:
+    """Strip embedded markup and entities and collapse whitespace."""
+    if "<" in value:
+        value = _TAG_PATTERN.sub(" ", value)
+    return _SPACE_PATTERN.sub(" ", html.unescape(value)).strip()
+
+
+def _is_prose(text: str, key: Optional[str]) -> bool:
+    """Return True if ``text`` reads like content rather than an identifier or code."""
+    words = text.count(" ") + 1
+    if words < (3 if key in TEXT_KEYS else MIN_PROSE_WORDS):
+        return False
+    if text.startswith(("http://", "https://", "/", "{", "[")) or "function(" in text:
+        return False
+    letters = sum(c.isalpha() for c in text)
+    return letters >= len(text) * 0.6
+
+
+def _json_strings(data: Any) -> Iterator[str]:
+    """Yield prose strings from a JSON value in document order."""
+    stack: List[tuple] = [(None, data)]
+    visited = 0
+
+    while stack and visited < MAX_JSON_NODES:
+        key, node = stack.pop()
+        visited += 1
+        if isinstance(node, str):
+            text = _clean(node)
+            if _is_prose(text, key):
+                yield text
+        elif isinstance(node, dict):
+            # Pushed in reverse so items are visited in their original order
+            items = [(k, v) for k, v in node.items() if k not in SKIP_KEYS]
+            stack.extend(reversed(items))
+        elif isinstance(node, list):
+            stack.extend((key, item) for item in reversed(node))
+
+
+def _parse_assignment(script: str, match: "re.Match") -> Any:
+    """Decode the JSON literal assigned at ``match``, or return None if it is not JSON."""
+    try:
+        value, _ = json.JSONDecoder().raw_decode(script, match.end())
+        return value
+    except ValueError:
+        return None
+
+
+def _embedded_payloads(soup: Any) -> Iterator[Any]:
+    """Yield decoded JSON-LD objects and hydration states from the page's scripts."""
+    for script in soup.find_all("script"):
+        source = script.string or ""
+        if not source.strip():
+            continue
+        script_type = (script.get("type") or "").lower()
+
+        if script_type == "application/ld+json" or script.get("id") in HYDRATION_SCRIPT_IDS \
+                or script_type == "application/json":
+            try:
+                yield json.loads(source)
+            except ValueError:
+                continue
+        elif not script_type or "javascript" in script_type:
+            for match in HYDRATION_GLOBALS.finditer(source):
+                value = _parse_assignment(source, match)
+                if value is not None:
+                    yield value
+
+
+def _meta_texts(soup: Any) -> List[str]:
+    """Return title and description texts from OpenGraph, Twitter and description meta tags."""
+    texts = []
+    for name in META_TEXT_NAMES:
+        tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+        if tag and tag.get("content"):
+            texts.append(_clean(tag["content"]))
+    return texts
+
+
+def extract_embedded_text(soup: Any, max_chars: Optional[int] = None) -> str:
+    """
+    Return readable text embedded in a parsed page's metadata and inline JSON.
+
+    Must be called before ``<script>`` and ``<meta>`` tags are removed.
+    Collects OpenGraph titles and descriptions first, then prose from JSON-LD
+    and hydration payloads, skipping exact repeats. Stops once ``max_chars``
+    characters are collected, without decoding the remaining payloads.
+    """
+    collected: List[str] = []
+    seen = set()
+    total = 0
+
+    payload_texts = (text for payload in _embedded_payloads(soup) for text in _json_strings(payload))
+    for text in itertools.chain(_meta_texts(soup), payload_texts):
+        if text in seen:
+            continue
+        seen.add(text)
+        collected.append(text)
+        total += len(text) + 2
+        if len(collected) >= MAX_EMBEDDED_STRINGS or (max_chars is not None and total >= max_chars):
+            break
+
+    return "\n\n".join(collected)
@@ -1,18 +1,23 @@
 # agent/enhanced_summarizer.py
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Callable, Dict, List, Tuple, Any, Optional
 import json
 from bs4 import BeautifulSoup
 import re
-from langchain.chains import LLMChain
-from langchain_google_genai import ChatGoogleGenerativeAI  # Import Gemini chat model
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from langchain.agents import initialize_agent, AgentType
-from langchain_core.runnables import RunnableSerializable
 
 from .browser import WebBrowserTool
 from .memory import SummarizerMemory
-from .improved_prompts import (
+from .models import (
+    DEFAULT_FALLBACK_MODEL,
+    TASK_SUMMARIZE,
+    TASK_TOPIC,
+    TASK_RELEVANCE,
+    TASK_QA,
+    ModelRouter
+)
+from .tokens import ENHANCED_MAX_PROMPT_TOKENS, RELEVANCE_PREVIEW_TOKENS, pack_sections, truncate_to_tokens
+from .tracing import span, url_host
+from .prompts import (
     ENHANCED_SUMMARIZATION_PROMPT,
     ENHANCED_AGENT_PROMPT,
     TOPIC_EXTRACTION_PROMPT,
@@ -22,43 +27,39 @@ from .improved_prompts import (
 class EnhancedWebpageSummarizer:
     """Enhanced agent that produces higher quality webpage summaries with content prioritization."""
     
-    def __init__(self, api_key: str, model: str = "gemini-1.5-pro"):
-        """Initialize the summarizer with Google API key and optional model."""
-        # We use Gemini's larger model for better handling of large webpages
-        self.llm = ChatGoogleGenerativeAI(
-            google_api_key=api_key,
-            model=model,
-            temperature=0,
-            # Gemini-specific parameters
-            top_p=0.95,
-            top_k=40
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-1.5-pro",
+        task_models: Optional[Dict[str, str]] = None,
+        fallback_model: Optional[str] = DEFAULT_FALLBACK_MODEL,
+        short_page_chars: int = 0,
+        llm_factory: Optional[Callable[[str, str], Any]] = None,
+        max_prompt_tokens: Optional[int] = ENHANCED_MAX_PROMPT_TOKENS
+    ):
+        """Initialize the summarizer with Google API key and optional per-task models."""
+        self.model = model
+
+        # We use Gemini's larger model for summaries; scoring and topics go to the fast tier
+        self.router = ModelRouter(
+            api_key=api_key,
+            task_models={TASK_SUMMARIZE: model, **(task_models or {})},
+            fallback_model=fallback_model,
+            short_page_chars=short_page_chars,
+            llm_factory=llm_factory,
+            max_prompt_tokens=max_prompt_tokens
         )
         self.browser_tool = WebBrowserTool()
         self.memory = SummarizerMemory(window_size=3)
         
-        # Create summarization chain with enhanced prompt
-        self.summarization_chain = LLMChain(
-            llm=self.llm,
-            prompt=ENHANCED_SUMMARIZATION_PROMPT,
-            output_parser=StrOutputParser()
-        )
-        
-        # Create topic extraction chain
-        self.topic_extraction_chain = LLMChain(
-            llm=self.llm,
-            prompt=TOPIC_EXTRACTION_PROMPT,
-            output_parser=StrOutputParser()
-        )
-        
-        # Create conversation chain with enhanced prompt
-        self.conversation_chain = LLMChain(
-            llm=self.llm,
-            prompt=ENHANCED_AGENT_PROMPT
-        )
-        
         # Create tools list
         self.tools = [self.browser_tool]
     
+    @property
+    def llm(self):
+        """The summarization LLM, created on first access."""
+        return self.router.llm(self.router.model_for(TASK_SUMMARIZE))
+    
     def _extract_sections(self, html_content: str) -> List[str]:
         """Extract meaningful sections from HTML content."""
         soup = BeautifulSoup(html_content, 'html.parser')
@@ -129,8 +130,10 @@ class EnhancedWebpageSummarizer:
         # For efficiency, limit to a reasonable number of sections
         sections_to_analyze = sections[:10] if len(sections) > 10 else sections
         
-        # Format sections for the prompt
-        sections_text = "\n".join([f"SECTION {i+1}:\n{section[:500]}...\n" 
+        # Format sections for the prompt, giving each an equal share of the scoring model's budget
+        budget = self.router.input_budget(TASK_RELEVANCE, RELEVANCE_SCORING_PROMPT)
+        preview_tokens = min(budget // len(sections_to_analyze) - 8, RELEVANCE_PREVIEW_TOKENS)
+        sections_text = "\n".join([f"SECTION {i+1}:\n{truncate_to_tokens(section, preview_tokens, '...')}\n"
                                  for i, section in enumerate(sections_to_analyze)])
         
         # Get relevance scores
@@ -139,10 +142,10 @@ class EnhancedWebpageSummarizer:
                 SystemMessage(content="You are a content relevance analyst."),
                 HumanMessage(content=RELEVANCE_SCORING_PROMPT.format(sections=sections_text))
             ]
-            response = self.llm.invoke(messages)
+            response = self.router.invoke(TASK_RELEVANCE, messages)
             
             # Extract JSON from the response
-            json_str = response.content.strip()
+            json_str = response.strip()
             # Handle case where model wraps JSON in ```json ... ``` format
             if json_str.startswith('```') and json_str.endswith('```'):
                 json_str = json_str.split('```')[1]
@@ -157,67 +160,75 @@ class EnhancedWebpageSummarizer:
     
     def _extract_main_topic(self, summary: str) -> str:
         """Extract the main topic from a summary using the topic extraction chain."""
-        topic = self.topic_extraction_chain.run(summary=summary)
+        topic = self.router.run(TASK_TOPIC, TOPIC_EXTRACTION_PROMPT, summary=summary)
         return topic.strip()
     
     def summarize_url(self, url: str) -> Dict[str, str]:
         """Summarize a webpage given its URL using the enhanced approach."""
-        try:
-            # Fetch webpage content
-            raw_content = self.browser_tool._run(url)
-            
-            if raw_content.startswith("Error"):
-                return {"error": raw_content}
-            
-            # Extract and score sections - handle Gemini's context window limits
-            sections = self._extract_sections(raw_content)
-            scored_sections = self._score_content_relevance(sections)
-            
-            # Filter to relevant sections
-            relevant_sections = []
-            for i, score_data in enumerate(scored_sections):
-                if i < len(sections) and score_data.get("include_in_summary", False):
-                    relevant_sections.append(sections[i])
-            
-            # If no sections were deemed relevant, use all sections
-            if not relevant_sections and sections:
-                relevant_sections = sections
-            
-            # Combine relevant sections for summarization
-            content_to_summarize = "\n\n".join(relevant_sections)
-            
-            # Adjust based on Gemini's context limits - may need to be reduced for some Gemini models
-            if len(content_to_summarize) > 12000:  
-                content_to_summarize = content_to_summarize[:12000]
-            
-            # Generate summary
-            summary = self.summarization_chain.run(content=content_to_summarize)
-            
-            # Extract main topic
-            main_topic = self._extract_main_topic(summary)
-            
-            # Store in memory
-            self.memory.set_summary(url, summary, main_topic)
-            
-            return {
-                "url": url,
-                "summary": summary,
-                "main_topic": main_topic
-            }
-        except Exception as e:
-            return {"error": f"Error summarizing webpage: {str(e)}"}
+        with span("summarize_url", {"url.host": url_host(url)}):
+            try:
+                # Fetch webpage content
+                raw_content = self.browser_tool._run(url)
+            
+                if raw_content.startswith("Error"):
+                    return {"error": raw_content}
+            
+                # Extract and score sections - handle Gemini's context window limits
+                with span("summarizer.extract_sections") as s:
+                    sections = self._extract_sections(raw_content)
+                    s.set_attribute("sections.count", len(sections))
+                scored_sections = self._score_content_relevance(sections)
+            
+                # Filter to relevant sections
+                relevant_sections = []
+                for i, score_data in enumerate(scored_sections):
+                    if i < len(sections) and score_data.get("include_in_summary", False):
+                        relevant_sections.append(sections[i])
+            
+                # If no sections were deemed relevant, use all sections
+                if not relevant_sections and sections:
+                    relevant_sections = sections
+            
+                # Combine as many relevant sections as the summarization model's context allows
+                content_chars = sum(len(section) for section in relevant_sections)
+                budget = self.router.input_budget(TASK_SUMMARIZE, ENHANCED_SUMMARIZATION_PROMPT, content_chars=content_chars)
+                content_to_summarize = "\n\n".join(pack_sections(relevant_sections, budget))
+            
+                # Generate summary
+                summary = self.router.run(
+                    TASK_SUMMARIZE,
+                    ENHANCED_SUMMARIZATION_PROMPT,
+                    content_chars=len(content_to_summarize),
+                    content=content_to_summarize
+                )
+            
+                # Extract main topic
+                main_topic = self._extract_main_topic(summary)
+            
+                # Store in memory
+                self.memory.set_summary(url, summary, main_topic)
+            
+                return {
+                    "url": url,
+                    "summary": summary,
+                    "main_topic": main_topic
+                }
+            except Exception as e:
+                return {"error": f"Error summarizing webpage: {str(e)}"}
     
     def answer_question(self, question: str) -> str:
         """Answer a question about the summarized webpage with improved context awareness."""
-        # Get chat history from memory
-        memory_vars = self.memory.load_memory_variables()
+        # Get chat history from memory as prompt-ready text
+        chat_history = self.memory.get_formatted_history()
         
         # Get current summary info
         summary_info = self.memory.get_summary()
         
         # Get response from conversation chain with enhanced context
-        response = self.conversation_chain.run(
-            chat_history=memory_vars.get("chat_history", ""),
+        response = self.router.run(
+            TASK_QA,
+            ENHANCED_AGENT_PROMPT,
+            chat_history=chat_history,
             summary=summary_info.get("summary", "No webpage has been summarized yet."),
             main_topic=summary_info.get("main_topic", "Unknown"),
             input=question
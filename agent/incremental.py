@@ -0,0 +1,120 @@
+"""
+Incremental re-summarization for frequently refreshed pages.
+Persists the extracted sections and summary of each URL so the next fetch
+can be diffed section by section, and only changed content sent to the LLM.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+# Changes up to this fraction of the page text reuse the previous summary
+DEFAULT_MIN_CHANGE_RATIO = 0.02
+
+# Changes beyond this fraction regenerate the summary from scratch
+FULL_REFRESH_RATIO = 0.6
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_sections(text: str, target_chars: int = 1500) -> List[str]:
+    """
+    Split page text into sections with content-defined boundaries.
+
+    A section ends after a sentence whose checksum hits a fixed pattern
+    (once the section is at least half of ``target_chars``), so inserting or
+    removing text only changes the sections around the edit instead of
+    shifting every boundary after it.
+    """
+    sections = []
+    current: List[str] = []
+    current_len = 0
+
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        if not sentence:
+            continue
+        current.append(sentence)
+        current_len += len(sentence) + 1
+
+        at_boundary = current_len >= target_chars // 2 and zlib.crc32(sentence.encode("utf-8")) % 4 == 0
+        if at_boundary or current_len >= target_chars * 2:
+            sections.append(" ".join(current))
+            current = []
+            current_len = 0
+
+    if current:
+        sections.append(" ".join(current))
+    return sections
+
+
+def section_digest(section: str) -> str:
+    """Return a short, whitespace- and case-insensitive digest of a section."""
+    normalized = " ".join(section.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+class SectionDiff:
+    """Section-level difference between two versions of a page."""
+
+    __slots__ = ("added", "removed", "unchanged_chars")
+
+    def __init__(self, added: List[str], removed: List[str], unchanged_chars: int):
+        self.added = added
+        self.removed = removed
+        self.unchanged_chars = unchanged_chars
+
+    @property
+    def changed_ratio(self) -> float:
+        """Fraction of the page text that was added or removed."""
+        changed = sum(len(s) for s in self.added) + sum(len(s) for s in self.removed)
+        total = changed + self.unchanged_chars
+        return changed / total if total else 0.0
+
+
+def diff_sections(old_sections: List[str], new_sections: List[str]) -> SectionDiff:
+    """Compare two section lists by digest."""
+    old_digests = {section_digest(s) for s in old_sections}
+    new_digests = {section_digest(s) for s in new_sections}
+
+    added = [s for s in new_sections if section_digest(s) not in old_digests]
+    removed = [s for s in old_sections if section_digest(s) not in new_digests]
+    unchanged_chars = sum(len(s) for s in new_sections if section_digest(s) in old_digests)
+    return SectionDiff(added, removed, unchanged_chars)
+
+
+class SectionStore:
+    """Persists the last extracted sections, summary and topic for each URL."""
+
+    def __init__(self, directory: str):
+        """Store one JSON file per URL under ``directory``."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored record for ``url``, or None."""
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, sections: List[str], summary: str, main_topic: str) -> None:
+        """Persist the latest sections, summary and topic for ``url``."""
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "sections": sections,
+                "summary": summary,
+                "main_topic": main_topic,
+            }, f)
+        # Atomic replace so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
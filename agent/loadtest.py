@@ -0,0 +1,411 @@
+"""
+Load-test harness and capacity report for the FastAPI service.
+
+Drives ``/summarize`` and ``/ask`` with open-loop (Poisson) arrivals at a
+series of rates, against the app running in-process over an ASGI transport
+or served by uvicorn on localhost. Target pages come from a local stand-in
+website and the LLM is replaced by a stub with configurable latency, so a
+run measures the service itself without network access or API quota. For
+each rate the report gives throughput, latency percentiles, error rate and
+event-loop lag, and it names the highest rate sustained within the latency
+objective (the saturation point is the next one).
+
+Usage:
+    python -m agent.loadtest --rates 1,2,5,10,20 --duration 20 --ask-ratio 0.3
+    python -m agent.loadtest --mode localhost --llm-latency 1.5 --json capacity.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .loopmonitor import LoopMonitor
+
+DEFAULT_QUESTIONS = [
+    "What is the main point of the webpage?",
+    "Who is the intended audience?",
+    "What evidence does the page give?",
+    "Summarize the second half in one sentence.",
+]
+
+_VOCABULARY = (
+    "market battery energy policy research data growth city climate network model service "
+    "customer report study price supply demand system design health school budget project "
+    "transport software security water industry community election science history travel"
+).split()
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    """Serves the stand-in site's pages."""
+
+    def do_GET(self) -> None:
+        site: "StandInSite" = self.server.site
+        if site.latency:
+            time.sleep(site.latency)
+        try:
+            number = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+        except ValueError:
+            self.send_error(404)
+            return
+        body = site.page(number).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandInSite:
+    """Local HTTP server with synthetic article pages at ``/page/<n>``."""
+
+    def __init__(self, latency: float = 0.05, words: int = 800):
+        self.latency = latency
+        self.words = words
+        self._server: Optional[ThreadingHTTPServer] = None
+        self.page = lru_cache(maxsize=1024)(self._render)
+
+    def _render(self, number: int) -> str:
+        rng = random.Random(number)
+        sentences = []
+        for _ in range(self.words // 12):
+            words = [rng.choice(_VOCABULARY) for _ in range(12)]
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraphs = "".join(f"<p>{' '.join(sentences[i:i + 5])}</p>" for i in range(0, len(sentences), 5))
+        links = "".join(f'<li><a href="/page/{number + i}">Related article {number + i}</a></li>' for i in (1, 2, 3))
+        return (f"<html><head><title>Article {number}</title></head><body>"
+                f"<nav><a href='/'>Home</a></nav><article><h1>Article {number}</h1>{paragraphs}"
+                f"<ul>{links}</ul></article></body></html>")
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the base URL."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _PageHandler)
+        self._server.daemon_threads = True
+        self._server.site = self
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="loadtest-site").start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+@lru_cache(maxsize=None)
+def _stub_model_class() -> type:
+    from langchain_core.language_models.chat_models import SimpleChatModel
+
+    class StubChatModel(SimpleChatModel):
+        """Chat model that sleeps for a sampled latency and echoes part of its prompt."""
+
+        latency: float = 0.5
+        jitter: float = 0.5
+        error_rate: float = 0.0
+
+        @property
+        def _llm_type(self) -> str:
+            return "loadtest-stub"
+
+        def _call(self, messages: List[Any], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> str:
+            time.sleep(max(0.0, self.latency * random.uniform(1 - self.jitter, 1 + self.jitter)))
+            if random.random() < self.error_rate:
+                raise RuntimeError("429 Resource has been exhausted (load-test stub)")
+            words = str(messages[-1].content).split()
+            return " ".join(words[-60:]) or "Stub response."
+
+    return StubChatModel
+
+
+def stub_llm_factory(latency: float = 0.5, jitter: float = 0.5, error_rate: float = 0.0) -> Callable[[str, str], Any]:
+    """Return an ``llm_factory`` whose models sleep ``latency`` (+/- ``jitter``) instead of calling Gemini."""
+    def factory(api_key: str, model: str) -> Any:
+        return _stub_model_class()(latency=latency, jitter=jitter, error_rate=error_rate)
+    return factory
+
+
+def _read_lines(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _load_app(llm_factory: Callable[[str, str], Any]) -> Any:
+    """Import ``app.py`` and swap its summarizer for one backed by the stub LLM."""
+    os.environ.setdefault("GOOGLE_API_KEY", "loadtest")
+    import app as service
+
+    from .config import summarizer_config_from_env
+    from .summarizer import WebpageSummarizer
+
+    service.summarizer = WebpageSummarizer(api_key="loadtest", llm_factory=llm_factory, **summarizer_config_from_env())
+    return service.app
+
+
+def _start_server(app: Any) -> Tuple[Any, str]:
+    """Serve ``app`` with uvicorn on a free localhost port from a background thread."""
+    import socket
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True, name="loadtest-server").start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def run_step(
+    client: Any,
+    rate: float,
+    duration: float,
+    page_urls: List[str],
+    questions: List[str],
+    ask_ratio: float,
+    max_outstanding: int,
+    request_timeout: float,
+    rng: random.Random
+) -> Dict[str, Any]:
+    """Send requests at ``rate`` per second for ``duration`` seconds and return the step's measurements."""
+    loop = asyncio.get_running_loop()
+    results: List[Tuple[str, float, bool]] = []
+    outstanding: set = set()
+    dropped = 0
+
+    async def send(kind: str, path: str, payload: Dict[str, str], scheduled: float) -> None:
+        try:
+            response = await client.post(path, json=payload, timeout=request_timeout)
+            ok = response.status_code == 200
+        except Exception:
+            ok = False
+        # Timed from the intended arrival, so a stalled client or loop that
+        # sends late is charged for the delay (no coordinated omission)
+        results.append((kind, loop.time() - scheduled, ok))
+
+    started = loop.time()
+    next_at = started
+    while True:
+        next_at += rng.expovariate(rate)
+        if next_at - started >= duration:
+            break
+        await asyncio.sleep(max(0.0, next_at - loop.time()))
+        if len(outstanding) >= max_outstanding:
+            dropped += 1
+            continue
+        if rng.random() < ask_ratio:
+            request = send("ask", "/ask", {"question": rng.choice(questions)}, next_at)
+        else:
+            request = send("summarize", "/summarize", {"url": rng.choice(page_urls)}, next_at)
+        task = asyncio.create_task(request)
+        outstanding.add(task)
+        task.add_done_callback(outstanding.discard)
+
+    stragglers = 0
+    if outstanding:
+        await asyncio.wait(set(outstanding), timeout=request_timeout)
+    if outstanding:
+        # Cancel requests that outlived the timeout so they do not load the next step
+        pending = set(outstanding)
+        stragglers = len(pending)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    latencies = [latency for _, latency, ok in results if ok]
+    failed = sum(1 for _, _, ok in results if not ok) + dropped + stragglers
+    sent = len(results) + dropped + stragglers
+    step = {
+        "rate": rate,
+        "sent": sent,
+        "offered_rate": sent / duration,
+        # Over the send window, like offered_rate; the drain wait would dilute it
+        "throughput": len(latencies) / duration,
+        "error_rate": failed / sent if sent else 0.0,
+        "p50": _percentile(latencies, 0.50),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+    }
+    for kind in ("summarize", "ask"):
+        step[f"{kind}_p95"] = _percentile([l for k, l, ok in results if ok and k == kind], 0.95)
+    return step
+
+
+def find_saturation(steps: List[Dict[str, Any]], slo_p95: float, max_error_rate: float) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Return ``(sustainable_rate, saturation_rate)``.
+
+    A rate is sustained when throughput keeps up with at least 90% of the
+    requests actually offered (Poisson arrivals vary around the nominal
+    rate), p95 latency stays within ``slo_p95`` and errors within
+    ``max_error_rate``.
+    """
+    sustainable = None
+    for step in steps:
+        healthy = (step["throughput"] >= 0.9 * step["offered_rate"]
+                   and step["p95"] is not None and step["p95"] <= slo_p95
+                   and step["error_rate"] <= max_error_rate)
+        if not healthy:
+            return sustainable, step["rate"]
+        sustainable = step["rate"]
+    return sustainable, None
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render the capacity report as a text table."""
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:.0f}" if value is not None else "-"
+
+    lines = [
+        f"{'rate/s':>7} {'sent':>6} {'done/s':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} "
+        f"{'errors':>7} {'sum p95':>8} {'ask p95':>8} {'lag p99':>8} {'lag max':>8}"
+    ]
+    for step in report["steps"]:
+        lines.append(
+            f"{step['rate']:>7g} {step['sent']:>6} {step['throughput']:>7.2f} {ms(step['p50']):>7} "
+            f"{ms(step['p95']):>7} {ms(step['p99']):>7} {step['error_rate']:>7.1%} "
+            f"{ms(step['summarize_p95']):>8} {ms(step['ask_p95']):>8} "
+            f"{ms(step.get('loop_lag_p99')):>8} {ms(step.get('loop_lag_max')):>8}"
+        )
+    sustainable, saturation = report["sustainable_rate"], report["saturation_rate"]
+    lines.append("")
+    lines.append(f"Sustainable rate: {sustainable if sustainable is not None else 'none'} req/s "
+                 f"(p95 <= {report['slo_p95']:g}s, errors <= {report['max_error_rate']:.0%})")
+    lines.append(f"Saturation point: {saturation if saturation is not None else 'not reached'}"
+                 f"{' req/s' if saturation is not None else ''}")
+    if report.get("blocking"):
+        lines.append("")
+        lines.append("Calls blocking the event loop (total seconds, count, longest):")
+        for site in report["blocking"]:
+            lines.append(f"  {site['total_seconds']:>8.2f}s {site['count']:>6}x {site['max_seconds']:>7.3f}s  {site['location']}")
+    return "\n".join(lines)
+
+
+async def run_load_test(args: argparse.Namespace) -> Dict[str, Any]:
+    """Set up the stand-ins and target, run every rate step and build the report."""
+    import httpx
+
+    site = StandInSite(latency=args.site_latency, words=args.page_words)
+    site_url = site.start()
+    page_urls = [f"{site_url}/page/{n}" for n in range(args.pages)]
+    monitor: Optional[LoopMonitor] = None
+    server = None
+
+    try:
+        if args.base_url:
+            # An already running server: its own LLM configuration and event loop are not ours to measure
+            client = httpx.AsyncClient(base_url=args.base_url, limits=httpx.Limits(max_connections=args.max_outstanding))
+        else:
+            app = _load_app(stub_llm_factory(args.llm_latency, args.llm_jitter, args.llm_error_rate))
+            monitor = LoopMonitor(log_blocks=False)
+            if args.mode == "localhost":
+                # Monitor the server's loop, which runs in another thread
+                async def start_monitor() -> None:
+                    monitor.start()
+                app.add_event_handler("startup", start_monitor)
+                server, base_url = _start_server(app)
+                client = httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=args.max_outstanding))
+            else:
+                # In-process requests run the endpoints on this loop
+                monitor.start()
+                client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+
+        rng = random.Random(args.seed)
+        steps = []
+        async with client:
+            # One summary first so /ask has a page to answer about
+            await client.post("/summarize", json={"url": page_urls[0]}, timeout=args.request_timeout)
+            for rate in args.rates:
+                if monitor:
+                    monitor.collect()
+                step = await run_step(client, rate, args.duration, page_urls, args.questions,
+                                      args.ask_ratio, args.max_outstanding, args.request_timeout, rng)
+                lag = monitor.collect() if monitor else []
+                step["loop_lag_p99"] = _percentile(lag, 0.99)
+                step["loop_lag_max"] = max(lag) if lag else None
+                steps.append(step)
+                print(f"rate {rate:g}/s: {step['throughput']:.2f} done/s, "
+                      f"p95 {step['p95'] if step['p95'] is not None else float('nan'):.3f}s, "
+                      f"errors {step['error_rate']:.1%}", file=sys.stderr)
+    finally:
+        if monitor:
+            monitor.stop()
+        if server is not None:
+            server.should_exit = True
+        site.stop()
+
+    sustainable, saturation = find_saturation(steps, args.slo_p95, args.max_error_rate)
+    return {
+        "mode": "external" if args.base_url else args.mode,
+        "duration": args.duration,
+        "ask_ratio": args.ask_ratio,
+        "llm_latency": args.llm_latency,
+        "site_latency": args.site_latency,
+        "slo_p95": args.slo_p95,
+        "max_error_rate": args.max_error_rate,
+        "steps": steps,
+        "sustainable_rate": sustainable,
+        "saturation_rate": saturation,
+        "blocking": monitor.blocking_sites() if monitor else [],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the load test and print the capacity report."""
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.loadtest",
+        description="Find how many /summarize and /ask requests per second one API worker sustains."
+    )
+    parser.add_argument("--mode", choices=("inprocess", "localhost"), default="inprocess",
+                        help="call the app through an ASGI transport, or serve it with uvicorn on localhost")
+    parser.add_argument("--base-url", help="load an already running server instead (it must reach the stand-in site)")
+    parser.add_argument("--rates", type=lambda s: [float(r) for r in s.split(",")], default=[1, 2, 5, 10, 20],
+                        help="comma-separated arrival rates in requests per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per rate step")
+    parser.add_argument("--ask-ratio", type=float, default=0.3, help="fraction of requests that are /ask")
+    parser.add_argument("--questions", type=_read_lines, default=DEFAULT_QUESTIONS, help="file with one question per line")
+    parser.add_argument("--pages", type=int, default=200, help="distinct pages on the stand-in site")
+    parser.add_argument("--page-words", type=int, default=800, help="words per stand-in page")
+    parser.add_argument("--site-latency", type=float, default=0.05, help="stand-in site response time in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="mean stub LLM call time in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.5, help="relative spread of the stub LLM time")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="fraction of stub LLM calls failing with 429")
+    parser.add_argument("--max-outstanding", type=int, default=256, help="requests in flight before new ones are dropped")
+    parser.add_argument("--request-timeout", type=float, default=60.0, help="client timeout per request in seconds")
+    parser.add_argument("--slo-p95", type=float, default=5.0, help="p95 latency objective in seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="highest acceptable error rate")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for arrivals and the request mix")
+    parser.add_argument("--json", help="also write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    if any(rate <= 0 for rate in args.rates):
+        parser.error("rates must be positive")
+
+    report = asyncio.run(run_load_test(args))
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
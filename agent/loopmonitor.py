@@ -0,0 +1,215 @@
+"""
+Event-loop lag and blocking-call detection for the API server.
+
+A heartbeat task on the event loop measures how late each periodic wake-up
+is (the loop lag). A watchdog thread notices when the heartbeat stops for
+longer than a threshold and samples the loop thread's stack while it is
+blocked, so synchronous code that stalls the loop (a blocking HTTP call,
+an LLM request, HTML parsing) is attributed to the line that ran it.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Frames from these directories are library code, not the cause of a block
+_LIBRARY_PATHS = tuple(
+    os.path.normcase(path) for path in {sysconfig.get_paths()["stdlib"], sysconfig.get_paths()["purelib"]}
+)
+
+_Stack = Tuple[Tuple[str, int, str], ...]
+
+
+def _is_library(filename: str) -> bool:
+    filename = os.path.normcase(filename)
+    return filename.startswith(_LIBRARY_PATHS) or "site-packages" in filename or "dist-packages" in filename
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _BlockSite:
+    """Aggregated blocking events attributed to one source location."""
+
+    __slots__ = ("count", "total_seconds", "max_seconds", "stack")
+
+    def __init__(self, stack: str):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.stack = stack
+
+
+class LoopMonitor:
+    """
+    Continuously measures event-loop lag and samples stacks of blocking calls.
+
+    The heartbeat wakes every ``interval`` seconds. When it has not run for
+    more than ``block_threshold`` seconds beyond that, the watchdog samples
+    the loop thread's stack every ``block_threshold / 2`` seconds until the
+    loop recovers; the most frequent sample is recorded against the
+    innermost frame outside the standard library and installed packages.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        block_threshold: float = 0.1,
+        max_sites: int = 100,
+        stack_depth: int = 15,
+        history: int = 1200,
+        log_blocks: bool = True
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.max_sites = max_sites
+        self.stack_depth = stack_depth
+        self.log_blocks = log_blocks
+        self.blocked_events = 0
+        self.blocked_seconds = 0.0
+        self._recent: Deque[float] = deque(maxlen=history)
+        self._window: List[float] = []
+        self._sites: Dict[str, _BlockSite] = {}
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop (call from a coroutine on that loop)."""
+        loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, daemon=True, name="loop-monitor")
+        self._watchdog.start()
+
+    def stop(self) -> None:
+        """Stop the heartbeat and the watchdog."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._last_beat = time.monotonic()
+            with self._lock:
+                self._recent.append(lag)
+                self._window.append(lag)
+
+    def _stack(self, frame: Any) -> _Stack:
+        entries = traceback.extract_stack(frame, limit=self.stack_depth)
+        return tuple((entry.filename, entry.lineno, entry.name) for entry in entries)
+
+    def _watch(self) -> None:
+        """Watchdog thread: sample the loop thread's stack while the heartbeat is stalled."""
+        samples: Counter = Counter()
+        stalled_beat = None
+
+        while not self._stopped.wait(self.block_threshold / 2):
+            beat = self._last_beat
+            if time.monotonic() - beat - self.interval >= self.block_threshold:
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    samples[self._stack(frame)] += 1
+                stalled_beat = beat
+            elif stalled_beat is not None and beat != stalled_beat:
+                # The loop is running again; the block lasted until this beat
+                self._record(max(0.0, beat - stalled_beat - self.interval), samples)
+                samples = Counter()
+                stalled_beat = None
+
+    def _record(self, duration: float, samples: Counter) -> None:
+        """Attribute one blocking event to the most frequently sampled stack."""
+        location = "unknown"
+        formatted = ""
+        if samples:
+            stack = samples.most_common(1)[0][0]
+            own = [entry for entry in stack if not _is_library(entry[0])]
+            filename, lineno, name = (own or stack)[-1]
+            if filename.startswith(os.getcwd() + os.sep):
+                filename = os.path.relpath(filename)
+            location = f"{filename}:{lineno} in {name}"
+            formatted = "".join(traceback.StackSummary.from_list(
+                [(filename, lineno, name, None) for filename, lineno, name in stack]
+            ).format())
+
+        with self._lock:
+            self.blocked_events += 1
+            self.blocked_seconds += duration
+            site = self._sites.get(location)
+            if site is None:
+                if len(self._sites) >= self.max_sites:
+                    location = "other"
+                    site = self._sites.setdefault(location, _BlockSite(""))
+                else:
+                    site = self._sites[location] = _BlockSite(formatted)
+            site.count += 1
+            site.total_seconds += duration
+            site.max_seconds = max(site.max_seconds, duration)
+            if formatted and location != "other":
+                site.stack = formatted
+
+        if self.log_blocks:
+            logger.warning("Event loop blocked for %.3fs at %s", duration, location)
+
+    def collect(self) -> List[float]:
+        """Return and reset the lag samples taken since the previous call."""
+        with self._lock:
+            samples, self._window = self._window, []
+        return samples
+
+    def blocking_sites(self, limit: int = 10, with_stacks: bool = True) -> List[Dict[str, Any]]:
+        """Return the source locations that blocked the loop longest in total."""
+        with self._lock:
+            sites = sorted(self._sites.items(), key=lambda item: item[1].total_seconds, reverse=True)[:limit]
+            return [
+                {
+                    "location": location,
+                    "count": site.count,
+                    "total_seconds": round(site.total_seconds, 3),
+                    "max_seconds": round(site.max_seconds, 3),
+                    **({"stack": site.stack} if with_stacks else {}),
+                }
+                for location, site in sites
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lag percentiles over recent heartbeats and the top blocking call sites."""
+        with self._lock:
+            recent = sorted(self._recent)
+            last = self._recent[-1] if self._recent else None
+            events, seconds = self.blocked_events, self.blocked_seconds
+        return {
+            "interval": self.interval,
+            "block_threshold": self.block_threshold,
+            "lag_seconds": {
+                "last": last,
+                "p50": _percentile(recent, 0.50),
+                "p99": _percentile(recent, 0.99),
+                "max": recent[-1] if recent else None,
+            },
+            "blocked_events": events,
+            "blocked_seconds": round(seconds, 3),
+            "top_blocking": self.blocking_sites(),
+        }
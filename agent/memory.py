@@ -1,72 +1,334 @@
 """
 Memory module for the webpage summarizer agent.
 Handles conversation history and stores webpage summary.
+
+Conversation turns and summaries are kept as compact ``__slots__`` records
+with interned URLs and topics. All sessions share a global byte budget:
+when it fills up, summaries of the least recently used sessions are
+zlib-compressed first, and whole sessions are evicted once the hard cap
+is reached. A single session never holds more than the compression
+threshold; a summary too large for that is truncated rather than pushing
+every other session out.
 """
 
-from langchain.memory import ConversationBufferWindowMemory
+import sys
+import threading
+import weakref
+import zlib
+from collections import OrderedDict, deque
 from typing import Dict, List, Any, Optional
 
+from .tracing import span
+
+# Default hard cap on memory held by all sessions together
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Summaries shorter than this are not worth compressing
+_MIN_COMPRESS_CHARS = 512
+
+_HUMAN = sys.intern("human")
+_AI = sys.intern("ai")
+
+
+class _Turn:
+    """One message of the conversation history."""
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = role
+        self.content = content
+
+    def size(self) -> int:
+        return sys.getsizeof(self) + sys.getsizeof(self.content)
+
+
+class _SummaryRecord:
+    """The current webpage summary, optionally zlib-compressed while cold."""
+
+    __slots__ = ("url", "topic", "_summary")
+
+    def __init__(self, url: Optional[str], summary: Optional[str], topic: Optional[str]):
+        self.url = sys.intern(url) if url else url
+        self.topic = sys.intern(topic) if topic else topic
+        self._summary = summary
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self._summary, bytes)
+
+    @property
+    def summary(self) -> Optional[str]:
+        """Return the summary text, decompressing it (and keeping it hot) if needed."""
+        if self.compressed:
+            self._summary = zlib.decompress(self._summary).decode("utf-8")
+        return self._summary
+
+    def compress(self) -> int:
+        """Compress the summary in place and return the number of bytes saved."""
+        if self.compressed or not self._summary or len(self._summary) < _MIN_COMPRESS_CHARS:
+            return 0
+        before = sys.getsizeof(self._summary)
+        packed = zlib.compress(self._summary.encode("utf-8"))
+        if sys.getsizeof(packed) >= before:
+            return 0
+        self._summary = packed
+        return before - sys.getsizeof(packed)
+
+    def size(self) -> int:
+        return sys.getsizeof(self) + (sys.getsizeof(self._summary) if self._summary else 0)
+
+
+class _MemoryBudget:
+    """Tracks memory of all live sessions in LRU order and enforces the global cap."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, compress_ratio: float = 0.5):
+        self.max_bytes = max_bytes
+        self.compress_ratio = compress_ratio
+        self.total_bytes = 0
+        self.evictions = 0
+        self._sessions: "OrderedDict[int, weakref.ref]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    def register(self, memory: "SummarizerMemory") -> None:
+        key = id(memory)
+        with self._lock:
+            self._sessions[key] = weakref.ref(memory, lambda _, key=key: self._forget(key))
+            self._sizes[key] = 0
+
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            self._sessions.pop(key, None)
+            self.total_bytes -= self._sizes.pop(key, 0)
+
+    def _adjust(self, key: int, delta: int) -> None:
+        self._sizes[key] = self._sizes.get(key, 0) + delta
+        self.total_bytes += delta
+
+    def touch(self, memory: "SummarizerMemory", delta: int = 0) -> None:
+        """Mark ``memory`` as most recently used and account for a size change."""
+        key = id(memory)
+        with self._lock:
+            if key in self._sessions:
+                self._sessions.move_to_end(key, last=True)
+            self._adjust(key, delta)
+            if self.total_bytes > self.max_bytes * self.compress_ratio:
+                self._enforce(memory)
+
+    def _lru_sessions(self, keep: "SummarizerMemory") -> List["SummarizerMemory"]:
+        sessions = [ref() for ref in self._sessions.values()]
+        return [s for s in sessions if s is not None and s is not keep]
+
+    def _enforce(self, keep: "SummarizerMemory") -> None:
+        # First compress cold summaries, least recently used first
+        for session in self._lru_sessions(keep):
+            if self.total_bytes <= self.max_bytes * self.compress_ratio:
+                return
+            self._adjust(id(session), -session._compress())
+
+        # A session too large for its share is compressed, then trimmed, so
+        # it cannot evict every other session and still exceed the cap
+        session_limit = int(self.max_bytes * self.compress_ratio)
+        if keep._bytes > session_limit:
+            self._adjust(id(keep), -keep._compress())
+        if keep._bytes > session_limit:
+            self._adjust(id(keep), -keep._shrink(session_limit))
+
+        # Then evict whole sessions until under the hard cap
+        for session in self._lru_sessions(keep):
+            if self.total_bytes <= self.max_bytes:
+                return
+            freed = session._evict()
+            if freed:
+                self._adjust(id(session), -freed)
+                self.evictions += 1
+
+    def usage(self) -> Dict[str, int]:
+        """Return global memory accounting."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+_budget = _MemoryBudget()
+
+
+def set_memory_budget(max_bytes: int, compress_ratio: float = 0.5) -> None:
+    """
+    Set the global memory cap shared by all sessions.
+
+    Summaries of cold sessions are compressed once usage exceeds
+    ``compress_ratio * max_bytes``; sessions are evicted above ``max_bytes``.
+    One session may hold at most ``compress_ratio * max_bytes``.
+    """
+    with _budget._lock:
+        _budget.max_bytes = max_bytes
+        _budget.compress_ratio = compress_ratio
+
+
+def get_memory_budget_usage() -> Dict[str, int]:
+    """Return memory accounting across all sessions."""
+    return _budget.usage()
+
+
 class SummarizerMemory:
     """Memory component that stores conversation context and webpage summary."""
-    
+
     def __init__(self, window_size: int = 3):
         """Initialize with specified window size for conversation history."""
-        self.memory = ConversationBufferWindowMemory(
-            k=window_size,
-            memory_key="chat_history",
-            return_messages=True,
-            input_key="input"
-        )
-        self.current_summary = None
-        self.current_url = None
-        self.main_topic = None
-    
+        self.window_size = window_size
+        self._lock = threading.RLock()
+        self._turns: deque = deque(maxlen=window_size * 2)
+        self._record = _SummaryRecord(None, None, None)
+        self._bytes = 0
+        _budget.register(self)
+
+    @property
+    def current_summary(self) -> Optional[str]:
+        return self.get_summary()["summary"]
+
+    @property
+    def current_url(self) -> Optional[str]:
+        return self._record.url
+
+    @property
+    def main_topic(self) -> Optional[str]:
+        return self._record.topic
+
+    def _resize(self) -> None:
+        """Recompute this session's size and report the change to the global budget."""
+        size = self._record.size() + sum(turn.size() for turn in self._turns)
+        delta = size - self._bytes
+        self._bytes = size
+        _budget.touch(self, delta)
+
+    def _compress(self) -> int:
+        """Compress the stored summary; called by the budget under memory pressure."""
+        # Skip sessions that are busy rather than wait (avoids lock-order deadlocks)
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            saved = self._record.compress()
+            self._bytes -= saved
+            return saved
+        finally:
+            self._lock.release()
+
+    def _shrink(self, max_bytes: int) -> int:
+        """Drop old turns, then truncate the summary, until within ``max_bytes``; return bytes freed."""
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            before = self._bytes
+            while self._turns and self._bytes > max_bytes:
+                self._bytes -= self._turns.popleft().size()
+
+            record = self._record
+            if self._bytes > max_bytes and record.size() > sys.getsizeof(record):
+                # Measure before reading the summary, which decompresses it
+                room = max_bytes - (self._bytes - record.size()) - sys.getsizeof(record)
+                summary = record.summary
+                end = len(summary)
+                while end > 0 and sys.getsizeof(summary[:end]) > room:
+                    end = min(end - 1, end * room // sys.getsizeof(summary[:end]))
+                self._record = _SummaryRecord(record.url, summary[:max(end, 0)], record.topic)
+                self._bytes = self._record.size() + sum(turn.size() for turn in self._turns)
+            return before - self._bytes
+        finally:
+            self._lock.release()
+
+    def _evict(self) -> int:
+        """Drop all stored state; called by the budget when over the hard cap."""
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            freed = self._bytes
+            self._turns.clear()
+            self._record = _SummaryRecord(None, None, None)
+            self._bytes = 0
+            return freed
+        finally:
+            self._lock.release()
+
     def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
         """Save the current conversation turn to memory."""
-        self.memory.save_context(inputs, outputs)
-    
+        with span("memory.save_context"), self._lock:
+            self._turns.append(_Turn(_HUMAN, str(inputs.get("input", ""))))
+            self._turns.append(_Turn(_AI, str(outputs.get("output", ""))))
+            self._resize()
+
     def load_memory_variables(self) -> Dict[str, Any]:
-        """Load conversation history from memory."""
-        return self.memory.load_memory_variables({})
-    
+        """Load conversation history from memory as LangChain messages."""
+        with span("memory.load") as s:
+            messages = self.get_messages()
+            s.set_attribute("memory.messages", len(messages))
+            return {"chat_history": messages}
+
     def set_summary(self, url: str, summary: str, topic: str) -> None:
         """Store the current webpage summary and its URL."""
-        self.current_summary = summary
-        self.current_url = url
-        self.main_topic = topic
-    
+        with span("memory.set_summary", {"memory.summary_chars": len(summary or "")}), self._lock:
+            self._record = _SummaryRecord(url, summary, topic)
+            self._resize()
+
     def get_summary(self) -> Dict[str, Optional[str]]:
         """Retrieve the current summary information."""
-        return {
-            "url": self.current_url,
-            "summary": self.current_summary,
-            "main_topic": self.main_topic
-        }
-    
+        with self._lock:
+            record = self._record
+            was_compressed = record.compressed
+            summary = record.summary
+            if was_compressed:
+                self._resize()
+            else:
+                _budget.touch(self)
+            return {
+                "url": record.url,
+                "summary": summary,
+                "main_topic": record.topic
+            }
+
     def clear(self) -> None:
         """Clear all memory."""
-        self.memory.clear()
-        self.current_summary = None
-        self.current_url = None
-        self.main_topic = None
+        with self._lock:
+            self._turns.clear()
+            self._record = _SummaryRecord(None, None, None)
+            self._resize()
 
     def get_messages(self) -> List:
-        """Get the raw message objects from memory for advanced processing."""
-        chat_history = self.load_memory_variables().get("chat_history", [])
-        return chat_history
-    
+        """Get the conversation history as LangChain message objects."""
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        with self._lock:
+            turns = list(self._turns)
+        return [
+            HumanMessage(content=turn.content) if turn.role is _HUMAN else AIMessage(content=turn.content)
+            for turn in turns
+        ]
+
     def get_formatted_history(self) -> str:
         """Get a nicely formatted string representation of the conversation history."""
-        chat_history = self.get_messages()
-        
-        if not chat_history:
+        with self._lock:
+            turns = list(self._turns)
+
+        if not turns:
             return "No conversation history."
-        
-        formatted_history = ""
-        for message in chat_history:
-            if hasattr(message, 'type') and message.type == 'human':
-                formatted_history += f"User: {message.content}\n\n"
-            elif hasattr(message, 'type') and message.type == 'ai':
-                formatted_history += f"Assistant: {message.content}\n\n"
-        
-        return formatted_history.strip()
\ No newline at end of file
+
+        return "\n\n".join(
+            f"{'User' if turn.role is _HUMAN else 'Assistant'}: {turn.content}"
+            for turn in turns
+        )
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Return memory accounting for this session."""
+        with self._lock:
+            return {
+                "turns": len(self._turns),
+                "turn_bytes": sum(turn.size() for turn in self._turns),
+                "summary_bytes": self._record.size(),
+                "summary_compressed": self._record.compressed,
+                "total_bytes": self._bytes,
+            }
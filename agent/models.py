@@ -0,0 +1,183 @@
+"""
+Model routing for the webpage summarizer.
+Maps each task (summarization, topic extraction, relevance scoring, Q&A)
+to its own Gemini model and falls back to a smaller model on overload.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from .tokens import DEFAULT_MAX_PROMPT_TOKENS, count_tokens, prompt_budget
+from .tracing import span, tracing_enabled
+
+# Task names used for routing
+TASK_SUMMARIZE = "summarize"
+TASK_TOPIC = "topic"
+TASK_RELEVANCE = "relevance"
+TASK_QA = "qa"
+
+# Only summaries need the large model; the short structured calls go to the fast tier
+DEFAULT_TASK_MODELS = {
+    TASK_SUMMARIZE: "gemini-1.5-pro",
+    TASK_TOPIC: "gemini-1.5-flash",
+    TASK_RELEVANCE: "gemini-1.5-flash",
+    TASK_QA: "gemini-1.5-flash",
+}
+DEFAULT_FALLBACK_MODEL = "gemini-1.5-flash"
+
+# Substrings of provider errors that indicate overload or rate limiting
+_OVERLOAD_MARKERS = (
+    "429",
+    "503",
+    "resource_exhausted",
+    "resource has been exhausted",
+    "quota",
+    "overloaded",
+    "unavailable",
+    "rate limit",
+)
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """Return True if an LLM error looks like overload or rate limiting."""
+    message = f"{type(error).__name__} {error}".lower()
+    return any(marker in message for marker in _OVERLOAD_MARKERS)
+
+
+def _gemini_factory(api_key: str, model: str) -> Any:
+    """Create a Gemini chat model with the project's default sampling settings."""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        google_api_key=api_key,
+        model=model,
+        temperature=0,
+        top_p=0.95,
+        top_k=40
+    )
+
+
+class ModelRouter:
+    """Chooses a model per task and runs prompts with fallback to a smaller model."""
+
+    def __init__(
+        self,
+        api_key: str,
+        task_models: Optional[Dict[str, str]] = None,
+        fallback_model: Optional[str] = DEFAULT_FALLBACK_MODEL,
+        short_page_chars: int = 0,
+        llm_factory: Optional[Callable[[str, str], Any]] = None,
+        max_prompt_tokens: Optional[int] = DEFAULT_MAX_PROMPT_TOKENS
+    ):
+        """
+        Initialize the router.
+
+        ``task_models`` overrides entries of ``DEFAULT_TASK_MODELS``.
+        Summaries of pages shorter than ``short_page_chars`` go straight to
+        ``fallback_model``; 0 disables that. ``llm_factory(api_key, model)``
+        creates chat models and defaults to Gemini. ``max_prompt_tokens``
+        caps prompts below the models' context windows for cost; None
+        allows the full window.
+        """
+        self.api_key = api_key
+        self.task_models = {**DEFAULT_TASK_MODELS, **(task_models or {})}
+        self.fallback_model = fallback_model
+        self.short_page_chars = short_page_chars
+        self.llm_factory = llm_factory or _gemini_factory
+        self.max_prompt_tokens = max_prompt_tokens
+        self._llms: Dict[str, Any] = {}
+        self._chains: Dict[tuple, Any] = {}
+
+    def model_for(self, task: str, content_chars: Optional[int] = None) -> str:
+        """Return the model that should handle ``task``."""
+        if (task == TASK_SUMMARIZE and self.fallback_model and content_chars is not None
+                and content_chars < self.short_page_chars):
+            return self.fallback_model
+        return self.task_models.get(task, self.task_models[TASK_SUMMARIZE])
+
+    def llm(self, model: str) -> Any:
+        """Return the (cached) chat model called ``model``."""
+        if model not in self._llms:
+            self._llms[model] = self.llm_factory(self.api_key, model)
+        return self._llms[model]
+
+    def chain(self, prompt: Any, model: str) -> Any:
+        """Return the (cached) chain running ``prompt`` on ``model``."""
+        key = (id(prompt), model)
+        if key not in self._chains:
+            from langchain.chains import LLMChain
+            from langchain_core.output_parsers import StrOutputParser
+
+            self._chains[key] = LLMChain(
+                llm=self.llm(model),
+                prompt=prompt,
+                output_parser=StrOutputParser()
+            )
+        return self._chains[key]
+
+    def input_budget(self, task: str, prompt: Any, content_chars: Optional[int] = None, **fixed_inputs: Any) -> int:
+        """
+        Return the tokens left for variable content in ``prompt`` for ``task``.
+
+        Accounts for the template text and ``fixed_inputs``, and for the
+        smallest context window among the model and its fallback.
+        """
+        candidates = self._candidates(self.model_for(task, content_chars))
+        budget = min(prompt_budget(model, self.max_prompt_tokens) for model in candidates)
+        used = count_tokens(prompt.template) + sum(count_tokens(str(value)) for value in fixed_inputs.values())
+        return max(0, budget - used)
+
+    def _candidates(self, model: str) -> List[str]:
+        """Return the primary model followed by its fallback, if different."""
+        if self.fallback_model and self.fallback_model != model:
+            return [model, self.fallback_model]
+        return [model]
+
+    def run(self, task: str, prompt: Any, content_chars: Optional[int] = None, **inputs: Any) -> str:
+        """Run ``prompt`` for ``task``, retrying on the fallback model when overloaded."""
+        prompt_tokens = None
+        if tracing_enabled():
+            prompt_tokens = count_tokens(prompt.template) + sum(count_tokens(str(v)) for v in inputs.values())
+        candidates = self._candidates(self.model_for(task, content_chars))
+
+        for attempt, model in enumerate(candidates):
+            with span(f"llm.{task}", {
+                "llm.model": model,
+                "llm.prompt_tokens": prompt_tokens,
+                "llm.retry_count": attempt,
+            }) as s:
+                try:
+                    result = self.chain(prompt, model).run(**inputs)
+                except Exception as e:
+                    if attempt + 1 < len(candidates) and is_overload_error(e):
+                        s.record_error(e)
+                        s.set_attribute("llm.fallback", True)
+                        continue
+                    raise
+                if prompt_tokens is not None:
+                    s.set_attribute("llm.completion_tokens", count_tokens(result))
+                return result
+
+    def invoke(self, task: str, messages: List[Any]) -> str:
+        """Send chat ``messages`` for ``task`` and return the response text."""
+        prompt_tokens = None
+        if tracing_enabled():
+            prompt_tokens = sum(count_tokens(message.content) for message in messages)
+        candidates = self._candidates(self.model_for(task))
+
+        for attempt, model in enumerate(candidates):
+            with span(f"llm.{task}", {
+                "llm.model": model,
+                "llm.prompt_tokens": prompt_tokens,
+                "llm.retry_count": attempt,
+            }) as s:
+                try:
+                    response = self.llm(model).invoke(messages)
+                except Exception as e:
+                    if attempt + 1 < len(candidates) and is_overload_error(e):
+                        s.record_error(e)
+                        s.set_attribute("llm.fallback", True)
+                        continue
+                    raise
+                if prompt_tokens is not None:
+                    s.set_attribute("llm.completion_tokens", count_tokens(response.content))
+                return response.content
@@ -0,0 +1,294 @@
+"""
+Speculative prefetch of pages linked from a summarized page.
+Ranks a page's outbound links by how likely a follow-up question is to be
+about them and fetches the best few in the background into a fetch cache,
+so a later summary of one of them skips the network round trip.
+"""
+
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .dedup import canonicalize_url
+from .tracing import span, url_host
+
+# Link targets that are files rather than HTML pages
+_FILE_EXTENSION = re.compile(
+    r'\.(?:pdf|zip|gz|tar|exe|dmg|apk|jpe?g|png|gif|webp|svg|ico|mp[34]|mov|avi|css|js|json|xml|rss|ics)$',
+    re.IGNORECASE
+)
+
+# Account, sharing and legal links nobody asks follow-up questions about
+_UTILITY_LINK = re.compile(
+    r'\b(?:log ?in|log ?out|sign ?in|sign ?up|register|subscribe|share|tweet|privacy|terms|cookies?'
+    r'|contact|careers|advertis\w*|newsletter|account|cart|checkout)\b',
+    re.IGNORECASE
+)
+
+_WORD_PATTERN = re.compile(r'[a-z]{4,}')
+
+
+class Link:
+    """An outbound link of a page with its anchor text."""
+
+    __slots__ = ("url", "text", "boilerplate")
+
+    def __init__(self, url: str, text: str, boilerplate: bool):
+        self.url = url
+        self.text = text
+        self.boilerplate = boilerplate
+
+
+def collect_links(soup: Any, base_url: str) -> List[Link]:
+    """Return the distinct http(s) links of a parsed page in document order."""
+    links: Dict[str, Link] = {}
+
+    for anchor in soup.find_all("a", href=True):
+        href = anchor["href"].strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:")):
+            continue
+        try:
+            url = urljoin(base_url, href).split("#", 1)[0]
+            # Reading the port validates it (e.g. rejects ":99999" or ":abc")
+            urlsplit(url).port
+        except ValueError:
+            continue
+        if not url.startswith(("http://", "https://")):
+            continue
+
+        text = anchor.get_text(" ", strip=True)
+        boilerplate = anchor.find_parent(["nav", "header", "footer", "aside", "form"]) is not None
+        link = links.get(url)
+        if link is None:
+            links[url] = Link(url, text, boilerplate)
+        else:
+            # A link that also appears in the body text is not just navigation
+            link.boilerplate = link.boilerplate and boilerplate
+            if len(text) > len(link.text):
+                link.text = text
+
+    return list(links.values())
+
+
+def rank_links(links: List[Link], page_url: str, context: str = "", limit: int = 5) -> List[str]:
+    """
+    Return up to ``limit`` link URLs, most likely follow-up first.
+
+    Links score higher for descriptive anchor text, for anchor words that
+    also occur in ``context`` (typically the page's summary and topic) and
+    for appearing early; navigation, utility and file links are dropped.
+    """
+    page = canonicalize_url(page_url)
+    context_words = set(_WORD_PATTERN.findall(context.lower()))
+    scored: List[Tuple[float, str]] = []
+    seen = {page}
+
+    for position, link in enumerate(links):
+        try:
+            canonical = canonicalize_url(link.url)
+        except ValueError:
+            continue
+        if canonical in seen or link.boilerplate:
+            continue
+        seen.add(canonical)
+        path = urlsplit(link.url).path
+        if _FILE_EXTENSION.search(path) or _UTILITY_LINK.search(link.text) or _UTILITY_LINK.search(path):
+            continue
+
+        words = _WORD_PATTERN.findall(link.text.lower())
+        if not words:
+            continue
+        score = min(len(words), 8) / 8
+        score += 2 * len(context_words.intersection(words)) / len(words)
+        score -= 0.5 * position / len(links)
+        if score > 0:
+            scored.append((score, link.url))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [url for _, url in scored[:limit]]
+
+
+class FetchCache:
+    """Size-bounded LRU cache of extracted pages, keyed by canonical URL, with a time-to-live."""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, int, str, List[Link]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, url: str) -> bool:
+        key = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry[0] < self.ttl
+
+    def get(self, url: str) -> Optional[Tuple[str, List[Link]]]:
+        """Return the cached ``(text, links)`` for ``url``, or None if absent or expired."""
+        key = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] >= self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    def put(self, url: str, text: str, links: List[Link]) -> None:
+        """Store an extracted page, evicting least recently used pages over the byte budget."""
+        key = canonicalize_url(url)
+        size = sys.getsizeof(text) + sum(len(link.url) + len(link.text) for link in links)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic(), size, text, links)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def usage(self) -> Dict[str, int]:
+        """Return cache accounting."""
+        with self._lock:
+            return {
+                "pages": len(self._entries),
+                "total_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class _ByteBudget:
+    """Bytes that one prefetch batch may still download."""
+
+    __slots__ = ("remaining", "lock")
+
+    def __init__(self, max_bytes: int):
+        self.remaining = max_bytes
+        self.lock = threading.Lock()
+
+    def consume(self, size: int) -> bool:
+        """Reserve ``size`` bytes; return False once the budget is exhausted."""
+        with self.lock:
+            if size > self.remaining:
+                self.remaining = 0
+                return False
+            self.remaining -= size
+            return True
+
+
+class LinkPrefetcher:
+    """
+    Background fetcher of the most promising links of a summarized page.
+
+    At most ``concurrency`` pages are fetched at once, each download is
+    aborted beyond ``max_page_bytes``, and one page's links may download at
+    most ``max_batch_bytes`` in total. Prefetches still queued when the next
+    page is summarized are cancelled, so the pool only works for the page
+    the user is currently reading.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[FetchCache] = None,
+        max_links: int = 5,
+        concurrency: int = 2,
+        max_page_bytes: int = 2 * 1024 * 1024,
+        max_batch_bytes: int = 8 * 1024 * 1024,
+        timeout: float = 10.0
+    ):
+        self.cache = cache if cache is not None else FetchCache()
+        self.max_links = max_links
+        self.max_page_bytes = max_page_bytes
+        self.max_batch_bytes = max_batch_bytes
+        self.timeout = timeout
+        self.stats = {"scheduled": 0, "fetched": 0, "skipped": 0, "failed": 0}
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="prefetch")
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def prefetch(self, browser: Any, page_url: str, links: List[Link], context: str = "") -> List[str]:
+        """
+        Schedule the top-ranked ``links`` of ``page_url`` for prefetching and return their URLs.
+
+        Best effort: if the links cannot be ranked, nothing is scheduled.
+        """
+        try:
+            urls = [url for url in rank_links(links, page_url, context, self.max_links) if url not in self.cache]
+        except Exception:
+            self._count("failed")
+            return []
+        budget = _ByteBudget(self.max_batch_bytes)
+
+        with self._lock:
+            for future in self._pending:
+                future.cancel()
+            self._pending = [self._executor.submit(self._fetch, browser, url, budget) for url in urls]
+            self.stats["scheduled"] += len(urls)
+        return urls
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _download(self, url: str, budget: _ByteBudget) -> Optional[Tuple[str, str]]:
+        """Return ``(html, final_url)`` for ``url``, or None if it is not HTML or over budget."""
+        import httpx
+
+        with httpx.stream("GET", url, follow_redirects=True, timeout=self.timeout) as response:
+            declared = int(response.headers.get("content-length") or 0)
+            if (response.status_code >= 400 or declared > self.max_page_bytes
+                    or "html" not in response.headers.get("content-type", "")):
+                return None
+
+            chunks = []
+            size = 0
+            for chunk in response.iter_bytes():
+                size += len(chunk)
+                if size > self.max_page_bytes or not budget.consume(len(chunk)):
+                    return None
+                chunks.append(chunk)
+
+            html = b"".join(chunks).decode(response.encoding or "utf-8", errors="replace")
+            return html, str(response.url)
+
+    def _fetch(self, browser: Any, url: str, budget: _ByteBudget) -> None:
+        """Download and extract one page into the cache."""
+        with span("prefetch.fetch", {"url.host": url_host(url)}) as s:
+            try:
+                page = self._download(url, budget)
+                if page is None:
+                    s.set_attribute("prefetch.skipped", True)
+                    self._count("skipped")
+                    return
+                text, links = browser._extract_page(*page)
+            except Exception:
+                self._count("failed")
+                return
+            self.cache.put(url, text, links)
+            s.set_attribute("text.chars", len(text))
+            self._count("fetched")
+
+    def usage(self) -> Dict[str, Any]:
+        """Return prefetch counters and cache accounting."""
+        with self._lock:
+            stats = dict(self.stats)
+        return {**stats, "cache": self.cache.usage()}
@@ -27,6 +27,33 @@ SUMMARIZATION_PROMPT = PromptTemplate(
     template=SUMMARIZATION_TEMPLATE
 )
 
+# Incremental update prompt - revises a previous summary using only changed sections
+UPDATE_SUMMARIZATION_TEMPLATE = """
+You are an expert content analyzer maintaining an up-to-date summary of a webpage that changes over time.
+
+PREVIOUS SUMMARY:
+{previous_summary}
+
+NEW OR CHANGED CONTENT:
+{added_content}
+
+REMOVED CONTENT:
+{removed_content}
+
+INSTRUCTIONS:
+1. Revise the previous summary so it reflects the page as it is now.
+2. Incorporate important information from the new or changed content.
+3. Drop statements that relied only on the removed content.
+4. Keep the style and length of the previous summary, and do not mention that it was updated.
+
+UPDATED SUMMARY:
+"""
+
+UPDATE_SUMMARIZATION_PROMPT = PromptTemplate(
+    input_variables=["previous_summary", "added_content", "removed_content"],
+    template=UPDATE_SUMMARIZATION_TEMPLATE
+)
+
 # Main conversation agent prompt - optimized for Gemini
 AGENT_TEMPLATE = """
 You are a helpful AI assistant specializing in webpage summarization and information retrieval.
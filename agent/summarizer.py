@@ -1,114 +1,508 @@
 """
 Main summarizer agent implementation using Google's Gemini API.
+
+LangChain, the Gemini client and the browser tool are heavy to import, so
+they are loaded on first use rather than when this module is imported; so
+are the optional features (incremental updates, near-duplicate detection,
+degraded summaries and prefetching), which are only imported when used.
 """
 
-from typing import Dict, List, Tuple, Any, Optional
-from langchain.chains import LLMChain
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple, Optional
 
-from .browser import WebBrowserTool
 from .memory import SummarizerMemory
-from .prompts import (
-    SUMMARIZATION_PROMPT, 
-    AGENT_PROMPT,
-    TOPIC_EXTRACTION_PROMPT
+from .models import (
+    DEFAULT_FALLBACK_MODEL,
+    TASK_SUMMARIZE,
+    TASK_TOPIC,
+    TASK_QA,
+    ModelRouter,
+    is_overload_error
 )
+from .tokens import DEFAULT_MAX_PROMPT_TOKENS, count_tokens, pack_sections, truncate_to_tokens
+from .tracing import span, url_host
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+    from langchain.chains import LLMChain
+    from .dedup import FingerprintIndex
+    from .degraded import QuotaGate
+    from .incremental import SectionStore
+    from .prefetch import LinkPrefetcher
 
 class WebpageSummarizer:
     """Agent that summarizes webpages and answers questions about them using Gemini."""
     
-    def __init__(self, api_key: str, model: str = "gemini-1.5-pro"):
-        """Initialize the summarizer with Google API key and model."""
-        # Initialize the Gemini LLM
-        self.llm = ChatGoogleGenerativeAI(
-            google_api_key=api_key,
-            model=model,
-            temperature=0,
-            top_p=0.95,
-            top_k=40
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-1.5-pro",
+        task_models: Optional[Dict[str, str]] = None,
+        fallback_model: Optional[str] = DEFAULT_FALLBACK_MODEL,
+        short_page_chars: int = 0,
+        llm_factory: Optional[Callable[[str, str], Any]] = None,
+        max_prompt_tokens: Optional[int] = DEFAULT_MAX_PROMPT_TOKENS,
+        section_store: Optional["SectionStore"] = None,
+        min_change_ratio: Optional[float] = None,
+        dedup_index: Optional["FingerprintIndex"] = None,
+        llm_deadline: Optional[float] = None,
+        quota_cooldown: float = 60.0,
+        llm_workers: int = 4,
+        llm_queue_size: int = 16,
+        prefetcher: Optional["LinkPrefetcher"] = None
+    ):
+        """
+        Initialize the summarizer with Google API key and model.
+        
+        ``model`` is used for summaries; ``task_models`` can route topic
+        extraction, relevance scoring and Q&A (see ``agent.models``) to
+        other, usually faster, models. With a ``section_store``, repeated
+        summaries of the same URL are only regenerated when more than
+        ``min_change_ratio`` (default ``DEFAULT_MIN_CHANGE_RATIO`` of
+        ``agent.incremental``) of the page text changed. With a ``dedup_index``,
+        pages whose text is near-identical to an already summarized page
+        reuse that page's summary. With an ``llm_deadline`` (seconds per
+        request), a local extractive summary flagged ``degraded`` is returned
+        when the LLM is too slow or over quota, and replaced by the LLM
+        summary in the background once it arrives. Those LLM calls run on
+        ``llm_workers`` threads (size it to the expected concurrent requests);
+        once ``llm_queue_size`` more are waiting, pages degrade immediately
+        rather than queue behind them. With a ``prefetcher``, the
+        most promising links of each summarized page are fetched in the
+        background so summarizing one of them next skips the network.
+        """
+        self.api_key = api_key
+        self.model = model
+        self.router = ModelRouter(
+            api_key=api_key,
+            task_models={TASK_SUMMARIZE: model, **(task_models or {})},
+            fallback_model=fallback_model,
+            short_page_chars=short_page_chars,
+            llm_factory=llm_factory,
+            max_prompt_tokens=max_prompt_tokens
         )
         
-        # Initialize tools and memory
-        self.browser_tool = WebBrowserTool()
+        self.section_store = section_store
+        self.min_change_ratio = min_change_ratio
+        self.dedup_index = dedup_index
+        self.prefetcher = prefetcher
+        
+        # Deadline-aware degradation state
+        self.llm_deadline = llm_deadline
+        self.quota_cooldown = quota_cooldown
+        self.llm_workers = llm_workers
+        self.llm_queue_size = llm_queue_size
+        self._lock = threading.Lock()
+        self._executor: Optional["ThreadPoolExecutor"] = None
+        self._in_flight: Dict[str, "Future"] = {}
+        self._degraded: Dict[str, str] = {}
+        self._upgraded: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        
+        # Initialize memory; the LLMs, tools and chains are built on first use
         self.memory = SummarizerMemory(window_size=3)
+    
+    @property
+    def llm(self):
+        """The summarization LLM, created on first access."""
+        return self.router.llm(self.router.model_for(TASK_SUMMARIZE))
+    
+    @cached_property
+    def browser_tool(self):
+        """The web browser tool, created on first access."""
+        from .browser import WebBrowserTool
         
-        # Create summarization chain
-        self.summarization_chain = LLMChain(
-            llm=self.llm,
-            prompt=SUMMARIZATION_PROMPT,
-            output_parser=StrOutputParser()
-        )
+        return WebBrowserTool(fetch_cache=self.prefetcher.cache if self.prefetcher else None)
+    
+    @cached_property
+    def quota_gate(self) -> "QuotaGate":
+        """Circuit breaker for LLM quota errors, created on first use."""
+        from .degraded import QuotaGate
         
-        # Create topic extraction chain
-        self.topic_extraction_chain = LLMChain(
-            llm=self.llm,
-            prompt=TOPIC_EXTRACTION_PROMPT,
-            output_parser=StrOutputParser()
-        )
+        return QuotaGate(cooldown=self.quota_cooldown)
+    
+    @property
+    def tools(self) -> List:
+        """Tools available to the agent."""
+        return [self.browser_tool]
+    
+    @property
+    def summarization_chain(self) -> "LLMChain":
+        """Chain that summarizes webpage content."""
+        from .prompts import SUMMARIZATION_PROMPT
         
-        # Create conversation chain
-        self.conversation_chain = LLMChain(
-            llm=self.llm,
-            prompt=AGENT_PROMPT
-        )
+        return self.router.chain(SUMMARIZATION_PROMPT, self.router.model_for(TASK_SUMMARIZE))
+    
+    @property
+    def topic_extraction_chain(self) -> "LLMChain":
+        """Chain that extracts the main topic from a summary."""
+        from .prompts import TOPIC_EXTRACTION_PROMPT
         
-        # Create tools list
-        self.tools = [self.browser_tool]
+        return self.router.chain(TOPIC_EXTRACTION_PROMPT, self.router.model_for(TASK_TOPIC))
+    
+    @property
+    def conversation_chain(self) -> "LLMChain":
+        """Chain that answers follow-up questions."""
+        from .prompts import AGENT_PROMPT
+        
+        return self.router.chain(AGENT_PROMPT, self.router.model_for(TASK_QA))
+    
+    def warm_up(self) -> None:
+        """Eagerly build the LLMs, tools and chains (e.g. from a background thread)."""
+        self.browser_tool
+        self.summarization_chain
+        self.topic_extraction_chain
+        self.conversation_chain
     
     def _extract_main_topic(self, summary: str) -> str:
         """Extract the main topic from a summary."""
         try:
             # Use the dedicated topic extraction chain
-            topic = self.topic_extraction_chain.run(summary=summary)
+            from .prompts import TOPIC_EXTRACTION_PROMPT
+            topic = self.router.run(TASK_TOPIC, TOPIC_EXTRACTION_PROMPT, summary=summary)
             return topic.strip()
         except Exception as e:
             # Fallback with direct prompting if chain fails
+            from langchain_core.messages import HumanMessage
             topic_prompt = f"Based on this summary, what is the single main topic in 2-5 words?\n\n{summary}"
             topic_messages = [HumanMessage(content=topic_prompt)]
-            response = self.llm.invoke(topic_messages)
-            return response.content.strip()
+            return self.router.invoke(TASK_TOPIC, topic_messages).strip()
+    
+    def _generate_summary(self, content: str) -> str:
+        """Summarize page content from scratch (short pages may be routed to the smaller model)."""
+        from .prompts import SUMMARIZATION_PROMPT
+        
+        return self.router.run(
+            TASK_SUMMARIZE,
+            SUMMARIZATION_PROMPT,
+            content_chars=len(content),
+            content=content
+        )
+    
+    def _summarize_incrementally(self, url: str, content: str) -> Tuple[str, str, str]:
+        """
+        Summarize content using the stored previous version of the page.
+        
+        Returns ``(summary, main_topic, refresh)`` where ``refresh`` is
+        ``"unchanged"`` (cached summary reused), ``"updated"`` (previous summary
+        revised from the changed sections) or ``"full"`` (regenerated).
+        """
+        from .incremental import DEFAULT_MIN_CHANGE_RATIO, FULL_REFRESH_RATIO, diff_sections, split_sections
+        
+        min_change_ratio = self.min_change_ratio
+        if min_change_ratio is None:
+            min_change_ratio = DEFAULT_MIN_CHANGE_RATIO
+        sections = split_sections(content)
+        previous = self.section_store.get(url)
+        
+        with span("summarizer.diff_sections", {"sections.count": len(sections)}) as s:
+            if previous is None:
+                refresh = "full"
+            else:
+                diff = diff_sections(previous["sections"], sections)
+                s.set_attributes({
+                    "sections.added": len(diff.added),
+                    "sections.removed": len(diff.removed),
+                    "sections.changed_ratio": round(diff.changed_ratio, 4),
+                })
+                if diff.changed_ratio <= min_change_ratio:
+                    refresh = "unchanged"
+                elif diff.changed_ratio >= FULL_REFRESH_RATIO:
+                    refresh = "full"
+                else:
+                    refresh = "updated"
+            s.set_attribute("summarizer.refresh", refresh)
+        
+        if refresh == "unchanged":
+            # Keep the stored sections as the baseline so small edits add up
+            return previous["summary"], previous["main_topic"], refresh
+        
+        if refresh == "updated":
+            from .prompts import UPDATE_SUMMARIZATION_PROMPT
+            # Route by the page's length, not the diff's, so long pages keep the large model
+            budget = self.router.input_budget(
+                TASK_SUMMARIZE,
+                UPDATE_SUMMARIZATION_PROMPT,
+                content_chars=len(content),
+                previous_summary=previous["summary"]
+            )
+            # Removed text only needs to be recognizable; new text gets the rest of the budget
+            removed_content = truncate_to_tokens("\n\n".join(diff.removed), budget // 4) or "(none)"
+            added_sections = pack_sections(diff.added, budget - count_tokens(removed_content))
+            added_content = "\n\n".join(added_sections) or "(none)"
+            summary = self.router.run(
+                TASK_SUMMARIZE,
+                UPDATE_SUMMARIZATION_PROMPT,
+                content_chars=len(content),
+                previous_summary=previous["summary"],
+                added_content=added_content,
+                removed_content=removed_content
+            )
+        else:
+            summary = self._generate_summary(content)
+        
+        main_topic = self._extract_main_topic(summary)
+        self.section_store.put(url, sections, summary, main_topic)
+        return summary, main_topic, refresh
+    
+    def _find_duplicate(self, canonical_url: str, fingerprint: Optional[int]) -> Optional[Dict[str, str]]:
+        """Return the indexed summary of a near-identical page, if any."""
+        if fingerprint is None:
+            return None
+        
+        with span("summarizer.dedup_lookup", {"dedup.index_size": len(self.dedup_index)}) as s:
+            match = self.dedup_index.lookup(fingerprint)
+            if match is None:
+                return None
+            entry, distance = match
+            s.set_attributes({"dedup.distance": distance, "dedup.match_host": url_host(entry["url"])})
+        
+        # Changes to the same page are handled by the incremental path when enabled
+        if entry["url"] == canonical_url and self.section_store is not None:
+            return None
+        return entry
+    
+    def _generate(self, canonical_url: str, content: str, fingerprint: Optional[int]) -> Dict[str, str]:
+        """Summarize content with the LLM and record it in the section store and dedup index."""
+        result = {}
+        if self.section_store is not None:
+            summary, main_topic, result["refresh"] = self._summarize_incrementally(canonical_url, content)
+        else:
+            summary = self._generate_summary(content)
+            main_topic = self._extract_main_topic(summary)
+        
+        # Index newly generated summaries so later copies of this page can reuse them
+        if fingerprint is not None and result.get("refresh") != "unchanged":
+            self.dedup_index.add(fingerprint, canonical_url, summary, main_topic)
+        
+        result["summary"] = summary
+        result["main_topic"] = main_topic
+        return result
+    
+    def _degraded_result(self, content: str, reason: str) -> Dict[str, Any]:
+        """Build a local extractive summary for when the LLM cannot answer in time."""
+        from .degraded import extractive_summary, keyword_topic
+        
+        with span("summarizer.degraded", {"degraded.reason": reason}):
+            return {
+                "summary": extractive_summary(content),
+                "main_topic": keyword_topic(content),
+                "degraded": True
+            }
+    
+    def _submit_generation(
+        self,
+        url: str,
+        canonical_url: str,
+        content: str,
+        fingerprint: Optional[int]
+    ) -> Optional["Future"]:
+        """Start (or join) the background LLM summarization of a page; None if the queue is full."""
+        with self._lock:
+            future = self._in_flight.get(canonical_url)
+            if future is None:
+                if len(self._in_flight) >= self.llm_workers + self.llm_queue_size:
+                    return None
+                if self._executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.llm_workers, thread_name_prefix="summarizer-llm"
+                    )
+                # Run in a copy of the caller's context so LLM spans keep their parent
+                future = self._executor.submit(
+                    contextvars.copy_context().run, self._generate, canonical_url, content, fingerprint
+                )
+                self._in_flight[canonical_url] = future
+                submitted = True
+            else:
+                submitted = False
+        
+        # Registered outside the lock: an already finished future runs the callback immediately
+        if submitted:
+            future.add_done_callback(lambda f: self._on_generated(canonical_url, f))
+        return future
+    
+    def _on_generated(self, canonical_url: str, future: "Future") -> None:
+        """Upgrade a degraded result once its LLM summary is ready."""
+        with self._lock:
+            self._in_flight.pop(canonical_url, None)
+            if future.cancelled() or canonical_url not in self._degraded:
+                return
+            url = self._degraded.pop(canonical_url)
+            error = future.exception()
+            if error is not None:
+                # Leave the degraded result; the next request for this page retries
+                if is_overload_error(error):
+                    self.quota_gate.trip()
+                return
+            result = future.result()
+            self._upgraded[canonical_url] = result
+            while len(self._upgraded) > 256:
+                self._upgraded.popitem(last=False)
+            
+            # Replace the stored summary if the user is still on this page; under
+            # the lock, so it cannot interleave with storing the degraded one
+            if self.memory.current_url == url:
+                self.memory.set_summary(url, result["summary"], result["main_topic"])
+    
+    def _store_degraded(self, url: str, canonical_url: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a degraded result in memory and register the page for an upgrade.
+        
+        Both happen under the lock, so the LLM summary, when it arrives, always
+        replaces the degraded one. Returns False if the page was already registered.
+        """
+        with self._lock:
+            self.memory.set_summary(url, result["summary"], result["main_topic"])
+            if canonical_url in self._degraded:
+                return False
+            self._degraded[canonical_url] = url
+            return True
+    
+    def _schedule_upgrade(self, url: str, canonical_url: str, content: str, fingerprint: Optional[int]) -> Dict[str, Any]:
+        """Answer with a degraded result and retry the LLM summarization once the quota gate reopens."""
+        result = self._degraded_result(content, "quota")
+        if not self._store_degraded(url, canonical_url, result):
+            return result
+        timer = threading.Timer(
+            self.quota_gate.remaining(),
+            contextvars.copy_context().run,
+            args=(self._submit_generation, url, canonical_url, content, fingerprint)
+        )
+        timer.daemon = True
+        timer.start()
+        return result
+    
+    def _generate_within_deadline(
+        self,
+        url: str,
+        canonical_url: str,
+        content: str,
+        fingerprint: Optional[int],
+        started: Optional[float]
+    ) -> Dict[str, Any]:
+        """Run the LLM path under the latency budget, degrading to an extractive summary."""
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        
+        with self._lock:
+            upgraded = self._upgraded.pop(canonical_url, None)
+        if upgraded is not None:
+            return upgraded
+        
+        if self.quota_gate.is_open():
+            return self._schedule_upgrade(url, canonical_url, content, fingerprint)
+        
+        future = self._submit_generation(url, canonical_url, content, fingerprint)
+        if future is None:
+            # The LLM queue is full; answer locally and let a later request retry
+            result = self._degraded_result(content, "busy")
+            self.memory.set_summary(url, result["summary"], result["main_topic"])
+            return result
+        
+        elapsed = time.monotonic() - started if started is not None else 0.0
+        try:
+            return future.result(timeout=max(0.0, self.llm_deadline - elapsed))
+        except FutureTimeoutError:
+            # Built before registering the page, as TextRank takes a while
+            result = self._degraded_result(content, "deadline")
+            with self._lock:
+                if not future.done():
+                    # Stored and registered together; see _store_degraded
+                    self.memory.set_summary(url, result["summary"], result["main_topic"])
+                    self._degraded[canonical_url] = url
+                    return result
+            # The LLM finished while the extractive summary was built
+            error = future.exception()
+            if error is None:
+                return future.result()
+        except Exception as e:
+            error = e
+        if not is_overload_error(error):
+            raise error
+        self.quota_gate.trip()
+        return self._schedule_upgrade(url, canonical_url, content, fingerprint)
+    
+    def _summarize_content(self, url: str, content: str, started: Optional[float] = None) -> Dict[str, Any]:
+        """Summarize already-extracted page content and store the result in memory."""
+        from .dedup import canonicalize_url, simhash
+        
+        result = {"url": url}
+        canonical_url = canonicalize_url(url)
+        fingerprint = simhash(content) if self.dedup_index is not None else None
+        
+        duplicate = self._find_duplicate(canonical_url, fingerprint)
+        if duplicate is not None:
+            result.update(summary=duplicate["summary"], main_topic=duplicate["main_topic"])
+            result["duplicate_of"] = duplicate["url"]
+        elif self.llm_deadline is None:
+            result.update(self._generate(canonical_url, content, fingerprint))
+        else:
+            result.update(self._generate_within_deadline(url, canonical_url, content, fingerprint, started))
+        
+        # Store in memory (degraded results were stored before their upgrade was registered)
+        if not result.get("degraded"):
+            self.memory.set_summary(url, result["summary"], result["main_topic"])
+        
+        return result
     
     def summarize_url(self, url: str) -> Dict[str, str]:
         """Summarize a webpage given its URL."""
-        try:
-            # Fetch webpage content
-            content = self.browser_tool._run(url)
-            
-            if content.startswith("Error"):
-                return {"error": content}
+        started = time.monotonic()
+        with span("summarize_url", {"url.host": url_host(url)}):
+            try:
+                # Fetch webpage content (and its links when prefetching)
+                content, links = self.browser_tool._fetch_page(url, with_links=self.prefetcher is not None)
             
-            # Handle large content for Gemini's context window
-            if len(content) > 30000:
-                content = content[:30000] + "...[content truncated due to length]"
+                if content.startswith("Error"):
+                    return {"error": content}
+            except Exception as e:
+                return {"error": f"Error summarizing webpage: {str(e)}"}
             
-            # Generate summary
-            summary = self.summarization_chain.run(content=content)
+            result = self.summarize_content(url, content, started)
             
-            # Extract main topic
-            main_topic = self._extract_main_topic(summary)
+            # Warm the fetch cache with the pages a follow-up is most likely about
+            if self.prefetcher is not None and links and "error" not in result:
+                context = f"{result['main_topic']} {result['summary']}"
+                try:
+                    self.prefetcher.prefetch(self.browser_tool, url, links, context)
+                except Exception:
+                    # Prefetching is an optimisation; it must never fail the summary
+                    pass
             
-            # Store in memory
-            self.memory.set_summary(url, summary, main_topic)
+            return result
+    
+    def summarize_content(self, url: str, content: str, started: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize text already extracted from ``url`` (e.g. fetched by a batch pipeline).
+        
+        ``started`` is the ``time.monotonic()`` at which the request began and
+        counts against the LLM deadline, if one is configured.
+        """
+        try:
+            # Fit the page into the context window of the model that will summarize it
+            from .prompts import SUMMARIZATION_PROMPT
+            budget = self.router.input_budget(TASK_SUMMARIZE, SUMMARIZATION_PROMPT, content_chars=len(content))
+            content = truncate_to_tokens(content, budget)
             
-            return {
-                "url": url,
-                "summary": summary,
-                "main_topic": main_topic
-            }
+            return self._summarize_content(url, content, started)
         except Exception as e:
             return {"error": f"Error summarizing webpage: {str(e)}"}
     
     def answer_question(self, question: str) -> str:
         """Answer a question about the summarized webpage."""
         try:
-            # Get chat history from memory
-            memory_vars = self.memory.load_memory_variables()
+            # Get chat history from memory as prompt-ready text
+            chat_history = self.memory.get_formatted_history()
             
             # Get response from conversation chain
-            response = self.conversation_chain.run(
-                chat_history=memory_vars.get("chat_history", ""),
+            from .prompts import AGENT_PROMPT
+            response = self.router.run(
+                TASK_QA,
+                AGENT_PROMPT,
+                chat_history=chat_history,
                 input=question
             )
             
@@ -0,0 +1,135 @@
+"""
+Token budgeting for prompts.
+Approximates model token counts locally and packs as much content as fits
+into the context window of the model that will receive it.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+# Context window (input tokens) by model name prefix; longest prefix wins
+MODEL_CONTEXT_TOKENS = {
+    "gemini-1.5-pro": 2_097_152,
+    "gemini-1.5-flash": 1_048_576,
+    "gemini-1.0-pro": 30_720,
+    "gemini-pro": 30_720,
+}
+DEFAULT_CONTEXT_TOKENS = 30_720
+
+# Tokens kept free for the model's answer
+OUTPUT_TOKEN_RESERVE = 2_048
+
+# Default prompt caps, sized so the page content they leave room for matches
+# the character cuts they replaced (about four characters per token) and
+# per-request cost stays where it was. None uses the full window.
+DEFAULT_MAX_PROMPT_TOKENS = 8_000  # WebpageSummarizer: 30,000 characters
+ENHANCED_MAX_PROMPT_TOKENS = 3_200  # EnhancedWebpageSummarizer: 12,000 characters
+
+# Longest section preview sent for relevance scoring (formerly 500 characters)
+RELEVANCE_PREVIEW_TOKENS = 125
+
+# Upper bound on extracted page text kept by the browser tool
+MAX_PAGE_TOKENS = 32_000
+
+TRUNCATION_MARKER = "...[content truncated due to length]"
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Counts are cached by (hash, length) rather than by the text itself so the
+# cache does not keep whole pages alive; str hashes are memoized by Python.
+_CACHE_SIZE = 4096
+_count_cache: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _approximate_tokens(text: str) -> int:
+    # Each word or punctuation mark is at least one token, and long words
+    # split into several; taking the larger of the two estimates errs on the
+    # side of overcounting so prompts never overflow.
+    return max(len(_TOKEN_PATTERN.findall(text)), (len(text) + 3) // 4)
+
+
+def count_tokens(text: str) -> int:
+    """Return an approximate (slightly conservative) token count for ``text``, cached per text."""
+    key = (hash(text), len(text))
+    with _cache_lock:
+        count = _count_cache.get(key)
+        if count is not None:
+            _count_cache.move_to_end(key)
+            return count
+
+    count = _approximate_tokens(text)
+    with _cache_lock:
+        _count_cache[key] = count
+        if len(_count_cache) > _CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return count
+
+
+def context_window(model: str) -> int:
+    """Return the input context window of ``model`` in tokens."""
+    matches = [prefix for prefix in MODEL_CONTEXT_TOKENS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_TOKENS
+    return MODEL_CONTEXT_TOKENS[max(matches, key=len)]
+
+
+def prompt_budget(model: str, max_prompt_tokens: Optional[int] = None,
+                  reserve: int = OUTPUT_TOKEN_RESERVE) -> int:
+    """Return how many prompt tokens ``model`` accepts, optionally capped by ``max_prompt_tokens``."""
+    window = context_window(model) - reserve
+    if max_prompt_tokens:
+        window = min(window, max_prompt_tokens)
+    return max(0, window)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+    """Return the longest whitespace-aligned prefix of ``text`` (plus ``marker``) within ``max_tokens``."""
+    # Text longer than four characters per token is over budget without counting
+    if len(text) <= max_tokens * 4 and count_tokens(text) <= max_tokens:
+        return text
+
+    limit = max_tokens - _approximate_tokens(marker)
+    if limit <= 0:
+        return ""
+
+    # One pass over at most 4 * limit characters (the chars/4 bound), stopping
+    # at the first token over the limit
+    end = 0
+    for count, match in enumerate(_TOKEN_PATTERN.finditer(text, 0, min(len(text), limit * 4)), 1):
+        if count > limit:
+            break
+        end = match.end()
+
+    # The last token may be cut short by the window; end on whitespace instead
+    cut = text.rfind(" ", 0, end + 1)
+    if cut < end // 2:
+        cut = end
+    return text[:cut].rstrip() + marker
+
+
+def pack_sections(sections: List[str], max_tokens: int, separator: str = "\n\n") -> List[str]:
+    """
+    Return the leading ``sections`` that fit in ``max_tokens`` when joined.
+
+    The first section that does not fit is truncated into the remaining space
+    if a meaningful amount (at least 64 tokens) is left.
+    """
+    packed = []
+    remaining = max_tokens
+    separator_tokens = _approximate_tokens(separator)
+
+    for section in sections:
+        cost = count_tokens(section) + (separator_tokens if packed else 0)
+        if cost <= remaining:
+            packed.append(section)
+            remaining -= cost
+            continue
+        room = remaining - (separator_tokens if packed else 0)
+        if room >= 64:
+            packed.append(truncate_to_tokens(section, room))
+        break
+
+    return packed
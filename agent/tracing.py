@@ -0,0 +1,220 @@
+"""
+Tracing support for the webpage summarizer.
+Records OpenTelemetry-compatible spans around fetches, parsing, LLM calls
+and memory access. Tracing is disabled by default and costs a single
+attribute lookup per span when off.
+"""
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+class Span:
+    """A finished-or-running span in OTLP JSON shape."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id",
+                 "start_ns", "end_ns", "attributes", "status", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Optional[Dict[str, Any]] = None):
+        """Start a span, inheriting the trace id from its parent if any."""
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = "OK"
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set a single span attribute."""
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        """Set several span attributes at once."""
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        """Mark the span as failed with the given exception."""
+        self.status = "ERROR"
+        self.attributes["exception.type"] = type(error).__name__
+        self.attributes["exception.message"] = str(error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span as an OTLP/JSON-style dictionary."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan:
+    """Span stand-in used when tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class FileSpanExporter:
+    """Append finished spans as JSON lines to a local file (a collector stand-in)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Write one finished span to the file."""
+        import json
+
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class _ActiveSpan:
+    """Context manager that starts, activates and exports a span."""
+
+    __slots__ = ("_tracer", "_span")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Optional[Dict[str, Any]]):
+        self._tracer = tracer
+        self._span = Span(name, _current_span.get(), attributes)
+
+    def __enter__(self) -> Span:
+        self._span._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        span = self._span
+        span.end_ns = time.time_ns()
+        if exc is not None:
+            span.record_error(exc)
+        _current_span.reset(span._token)
+        try:
+            self._tracer.exporter.export(span)
+        except Exception:
+            # Tracing must never break the request being traced
+            pass
+        return False
+
+
+class _OtelSpan:
+    """Adapter that forwards spans to the OpenTelemetry API."""
+
+    __slots__ = ("_cm", "_span")
+
+    def __init__(self, otel_tracer: Any, name: str, attributes: Optional[Dict[str, Any]]):
+        self._cm = otel_tracer.start_as_current_span(name, attributes=attributes or {})
+        self._span = None
+
+    def __enter__(self) -> Any:
+        self._span = self._cm.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return self._cm.__exit__(exc_type, exc, tb)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._span.set_attribute(key, value)
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self._span.set_attributes(attributes)
+
+    def record_error(self, error: BaseException) -> None:
+        self._span.record_exception(error)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to an exporter."""
+
+    def __init__(self, exporter: Optional[FileSpanExporter] = None, otel_tracer: Any = None):
+        self.exporter = exporter
+        self.otel_tracer = otel_tracer
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """Return a context manager for a new child of the current span."""
+        if self.otel_tracer is not None:
+            return _OtelSpan(self.otel_tracer, name, attributes)
+        return _ActiveSpan(self, name, attributes)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(exporter: Optional[str] = None, path: Optional[str] = None) -> Optional[Tracer]:
+    """
+    Enable or disable tracing.
+
+    ``exporter`` is ``"file"`` (JSON lines, OTLP-shaped), ``"otel"`` (forward
+    to an installed OpenTelemetry SDK, e.g. configured with an OTLP exporter)
+    or ``None``/``"none"`` to disable. Defaults come from the
+    ``TRACE_EXPORTER`` and ``TRACE_FILE`` environment variables.
+    """
+    global _tracer
+
+    exporter = (exporter if exporter is not None else os.getenv("TRACE_EXPORTER", "")).lower()
+
+    if exporter == "file":
+        _tracer = Tracer(exporter=FileSpanExporter(path or os.getenv("TRACE_FILE", "traces.jsonl")))
+    elif exporter == "otel":
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ValueError("TRACE_EXPORTER=otel requires the opentelemetry-api package")
+        _tracer = Tracer(otel_tracer=trace.get_tracer("agent"))
+    else:
+        _tracer = None
+
+    return _tracer
+
+
+def tracing_enabled() -> bool:
+    """Return True if spans are currently being recorded."""
+    return _tracer is not None
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Return a context manager wrapping ``name`` in a span, or a no-op when disabled."""
+    if _tracer is None:
+        return _NOOP_SPAN
+    return _tracer.start_span(name, attributes)
+
+
+def url_host(url: str) -> str:
+    """Return the host part of a URL for use as a span attribute."""
+    from urllib.parse import urlparse
+
+    try:
+        return urlparse(url).hostname or ""
+    except ValueError:
+        return ""
@@ -4,13 +4,19 @@ Provides API endpoints for summarizing webpages and asking follow-up questions.
 """
 
 import os
+import asyncio
 from fastapi import FastAPI, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl, Field
 from typing import Dict, Optional, List
 from dotenv import load_dotenv
 
+from agent.config import summarizer_config_from_env
+from agent.loopmonitor import LoopMonitor
+from agent.memory import get_memory_budget_usage, set_memory_budget
 from agent.summarizer import WebpageSummarizer
+from agent.tracing import configure_tracing
 
 # Load environment variables
 load_dotenv()
@@ -20,11 +26,20 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable is not set")
 
-# Get optional model name or use default
-MODEL_NAME = os.getenv("MODEL_NAME", "gemini-1.5-pro")
+# Enable tracing if TRACE_EXPORTER is set ("file" or "otel")
+configure_tracing()
+
+# Hard cap on memory held by all conversation sessions (summaries are compressed at half of it)
+set_memory_budget(int(os.getenv("MEMORY_MAX_BYTES", str(256 * 1024 * 1024))))
+
+# Optional monitor of event-loop lag that samples stacks of calls blocking the loop
+loop_monitor = None
+if os.getenv("LOOP_MONITOR", "false").lower() in ("1", "true", "yes"):
+    loop_monitor = LoopMonitor(block_threshold=float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000)
 
 # Initialize summarizer agent
-summarizer = WebpageSummarizer(api_key=GOOGLE_API_KEY, model=MODEL_NAME)
+# (models, fallback and incremental cache are configured via environment variables)
+summarizer = WebpageSummarizer(api_key=GOOGLE_API_KEY, **summarizer_config_from_env())
 
 # Create FastAPI app
 app = FastAPI(
@@ -42,6 +57,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def warm_up_summarizer():
+    """Build the LLM client and chains in a background thread so startup is not blocked."""
+    if os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes"):
+        asyncio.get_running_loop().run_in_executor(None, summarizer.warm_up)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    """Start measuring event-loop lag if LOOP_MONITOR is enabled."""
+    if loop_monitor:
+        loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    """Stop the event-loop monitor."""
+    if loop_monitor:
+        loop_monitor.stop()
+
 # Define request models
 class SummarizeRequest(BaseModel):
     url: HttpUrl
@@ -68,6 +101,7 @@ class SummaryResponse(BaseModel):
     summary: str
     main_topic: str
     url: HttpUrl
+    degraded: bool = False
 
 class ErrorResponse(BaseModel):
     error: str
@@ -84,7 +118,8 @@ class StatusResponse(BaseModel):
 async def summarize_webpage(request: SummarizeRequest):
     """Summarize a webpage and extract its main topic."""
     try:
-        result = summarizer.summarize_url(str(request.url))
+        # Fetching and the LLM deadline wait block, so keep them off the event loop
+        result = await run_in_threadpool(summarizer.summarize_url, str(request.url))
         
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -92,7 +127,8 @@ async def summarize_webpage(request: SummarizeRequest):
         return {
             "summary": result["summary"],
             "main_topic": result["main_topic"],
-            "url": request.url
+            "url": request.url,
+            "degraded": result.get("degraded", False)
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -109,7 +145,7 @@ async def ask_question(request: QuestionRequest):
         )
         
     try:
-        answer = summarizer.answer_question(request.question)
+        answer = await run_in_threadpool(summarizer.answer_question, request.question)
         return {"answer": answer}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -137,6 +173,21 @@ async def clear_memory():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/memory")
+async def memory_usage():
+    """Report memory used by the current session and by all sessions together."""
+    return {
+        "session": summarizer.memory.memory_usage(),
+        "global": get_memory_budget_usage()
+    }
+
+@app.get("/metrics/loop")
+async def loop_metrics():
+    """Report event-loop lag and the call sites that blocked the loop the longest."""
+    if not loop_monitor:
+        raise HTTPException(status_code=404, detail="Event-loop monitor is disabled; set LOOP_MONITOR=true")
+    return loop_monitor.stats()
+
 @app.get("/health", response_model=StatusResponse)
 async def health_check():
     """Check if the API is operational."""
@@ -0,0 +1,20 @@
+"""
+Tests for the bulk summarization CLI's checkpointing.
+"""
+
+import json
+
+from agent.cli import load_checkpoint
+
+
+def test_degraded_and_failed_results_are_not_final(tmp_path):
+    path = tmp_path / "out.jsonl"
+    records = [
+        {"url": "https://example.com/done", "summary": "LLM summary", "main_topic": "Topic"},
+        {"url": "https://example.com/degraded", "summary": "Extract", "main_topic": "Topic", "degraded": True},
+        {"url": "https://example.com/failed", "error": "Error accessing URL: timeout"},
+    ]
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + '{"url": "https://exa')
+
+    assert load_checkpoint(str(path)) == {"https://example.com/done", "https://example.com/failed"}
+    assert load_checkpoint(str(path), retry_errors=True) == {"https://example.com/done"}
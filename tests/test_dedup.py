@@ -0,0 +1,77 @@
+"""
+Tests for URL canonicalization and the fingerprint index.
+"""
+
+import hashlib
+
+from agent.dedup import FingerprintIndex, canonicalize_url
+
+
+def _fingerprint(i):
+    return int.from_bytes(hashlib.blake2b(str(i).encode(), digest_size=8).digest(), "big")
+
+
+def test_canonicalize_keeps_ref_parameter():
+    assert canonicalize_url("https://github.com/o/r/blob/x?ref=main") == "https://github.com/o/r/blob/x?ref=main"
+    assert canonicalize_url("https://www.example.com/a/?utm_source=x&b=1#top") == "https://example.com/a?b=1"
+
+
+def test_readding_a_url_replaces_its_entry(tmp_path):
+    path = str(tmp_path / "index")
+    index = FingerprintIndex(path)
+    for version in range(10):
+        index.add(0xABCDEF, "https://example.com/a", f"summary {version}", "topic")
+
+    assert len(index) == 1
+    assert index.lookup(0xABCDEF)[0]["summary"] == "summary 9"
+    # Replaced entries are compacted away rather than accumulating on disk
+    with open(f"{path}.jsonl") as f:
+        assert len(f.readlines()) < 10
+
+    reloaded = FingerprintIndex(path)
+    assert len(reloaded) == 1
+    assert reloaded.lookup(0xABCDEF)[0]["summary"] == "summary 9"
+
+
+def test_oldest_entries_are_evicted_beyond_max_entries(tmp_path):
+    path = str(tmp_path / "index")
+    index = FingerprintIndex(path, max_entries=3)
+    for i in range(20):
+        index.add(_fingerprint(i), f"https://example.com/{i}", f"summary {i}", "topic")
+
+    assert len(index) == 3
+    assert index.lookup(_fingerprint(0)) is None
+    assert index.lookup(_fingerprint(19))[0]["url"] == "https://example.com/19"
+    assert len(index.fingerprints) <= 2 * 3 + 1
+
+    reloaded = FingerprintIndex(path, max_entries=2)
+    assert len(reloaded) == 2
+    assert len(reloaded.fingerprints) == 2
+    assert reloaded.lookup(_fingerprint(17)) is None
+
+
+def test_processes_sharing_a_path_keep_fingerprints_with_their_summaries(tmp_path):
+    path = str(tmp_path / "index")
+    first, second = FingerprintIndex(path), FingerprintIndex(path)
+    for i in range(20):
+        (first if i % 2 else second).add(_fingerprint(i), f"https://example.com/{i}", f"summary {i}", "topic")
+
+    reloaded = FingerprintIndex(path)
+    assert len(reloaded) == 20
+    for i in range(20):
+        assert reloaded.lookup(_fingerprint(i)) == ({"url": f"https://example.com/{i}", "summary": f"summary {i}", "main_topic": "topic"}, 0)
+
+
+def test_partial_and_legacy_lines_are_dropped_on_load(tmp_path):
+    path = str(tmp_path / "index")
+    FingerprintIndex(path).add(_fingerprint(1), "https://example.com/1", "summary 1", "topic")
+    with open(f"{path}.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"url": "https://example.com/old", "summary": "no fingerprint", "main_topic": "topic"}\n')
+        f.write('{"fingerprint": "00ff", "url": "https://exa')
+
+    reloaded = FingerprintIndex(path)
+    assert len(reloaded) == 1
+    with open(f"{path}.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
+    reloaded.add(_fingerprint(2), "https://example.com/2", "summary 2", "topic")
+    assert len(FingerprintIndex(path)) == 2
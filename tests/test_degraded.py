@@ -0,0 +1,133 @@
+"""
+Tests for the LLM deadline and degraded-mode hand-off in ``WebpageSummarizer``.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+from agent import tracing
+from agent.summarizer import WebpageSummarizer
+
+PAGE = " ".join(
+    f"The market for electric vehicles grew by {i} percent as battery prices fell sharply this year."
+    for i in range(60)
+)
+
+
+class ImmediateExecutor:
+    """Executor whose futures have already finished when ``submit`` returns."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def _run_with_timeout(target, timeout=5.0):
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(value=target()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "summarizer deadlocked"
+    return result["value"]
+
+
+def _summarizer():
+    summarizer = WebpageSummarizer(api_key="test", llm_deadline=5.0)
+    summarizer._generate = lambda canonical_url, content, fingerprint: {
+        "summary": "LLM summary",
+        "main_topic": "LLM Topic",
+    }
+    return summarizer
+
+
+def test_llm_that_finishes_immediately_does_not_deadlock():
+    summarizer = _summarizer()
+    summarizer._executor = ImmediateExecutor()
+
+    result = _run_with_timeout(lambda: summarizer._summarize_content("https://example.com/a", PAGE))
+
+    assert result["summary"] == "LLM summary"
+    assert not result.get("degraded")
+    assert not summarizer._in_flight
+
+
+def test_llm_calls_keep_the_callers_tracing_context():
+    summarizer = _summarizer()
+    seen = []
+    generate = summarizer._generate
+    summarizer._generate = lambda *args: seen.append(tracing._current_span.get()) or generate(*args)
+
+    parent = object()
+
+    def summarize():
+        tracing._current_span.set(parent)
+        return summarizer._summarize_content("https://example.com/a", PAGE)
+
+    _run_with_timeout(summarize)
+
+    assert seen == [parent]
+
+
+def test_llm_summary_finishing_during_the_fallback_is_not_overwritten():
+    summarizer = _summarizer()
+    summarizer.llm_deadline = 0.05
+    release = threading.Event()
+    generate = summarizer._generate
+    summarizer._generate = lambda *args: release.wait(5) and generate(*args)
+
+    degraded_result = summarizer._degraded_result
+
+    def slow_degraded_result(content, reason):
+        # The LLM answers while the extractive summary is still being built
+        release.set()
+        deadline = time.monotonic() + 5
+        while summarizer._in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return degraded_result(content, reason)
+
+    summarizer._degraded_result = slow_degraded_result
+    result = _run_with_timeout(lambda: summarizer._summarize_content("https://example.com/a", PAGE))
+
+    assert result["summary"] == "LLM summary"
+    assert summarizer.memory.get_summary()["summary"] == "LLM summary"
+
+
+def test_late_llm_summary_replaces_the_degraded_one_in_memory():
+    summarizer = _summarizer()
+    summarizer.llm_deadline = 0.05
+    release = threading.Event()
+    generate = summarizer._generate
+    summarizer._generate = lambda *args: release.wait(5) and generate(*args)
+
+    result = _run_with_timeout(lambda: summarizer._summarize_content("https://example.com/a", PAGE))
+    assert result["degraded"]
+    assert summarizer.memory.get_summary()["summary"] == result["summary"]
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while summarizer._in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert summarizer.memory.get_summary()["summary"] == "LLM summary"
+
+
+def test_full_llm_queue_degrades_immediately():
+    summarizer = _summarizer()
+    summarizer.llm_deadline = 0.05
+    summarizer.llm_workers = 1
+    summarizer.llm_queue_size = 0
+    release = threading.Event()
+    generate = summarizer._generate
+    summarizer._generate = lambda *args: release.wait(5) and generate(*args)
+
+    try:
+        assert summarizer._summarize_content("https://example.com/a", PAGE)["degraded"]
+        started = time.monotonic()
+        result = summarizer._summarize_content("https://example.com/b", PAGE)
+        assert result["degraded"]
+        assert time.monotonic() - started < 0.05 + 1.0
+        assert list(summarizer._in_flight) == ["https://example.com/a"]
+        assert summarizer.memory.get_summary()["url"] == "https://example.com/b"
+    finally:
+        release.set()
@@ -0,0 +1,70 @@
+"""
+Tests for text extraction from embedded page data.
+"""
+
+import json
+import time
+
+from agent.embedded import extract_embedded_text
+
+
+class FakeTag:
+    def __init__(self, attrs, string=None):
+        self.attrs = attrs
+        self.string = string
+
+    def get(self, key):
+        return self.attrs.get(key)
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+
+class FakeSoup:
+    """The parts of a BeautifulSoup document that ``extract_embedded_text`` uses."""
+
+    def __init__(self, scripts, metas=()):
+        self.scripts = list(scripts)
+        self.metas = list(metas)
+
+    def find_all(self, name):
+        return self.scripts
+
+    def find(self, name, attrs):
+        for meta in self.metas:
+            if all(meta.get(key) == value for key, value in attrs.items()):
+                return meta
+        return None
+
+
+def _sentence(i):
+    return f"Paragraph {i} explains how battery prices shaped the electric vehicle market this year."
+
+
+def _next_data(count):
+    payload = {"props": {"pageProps": {"blocks": [{"text": _sentence(i)} for i in range(count)]}}}
+    return FakeTag({"id": "__NEXT_DATA__", "type": "application/json"}, json.dumps(payload))
+
+
+def test_meta_and_payload_text_is_collected_once():
+    soup = FakeSoup(
+        [FakeTag({"type": "application/ld+json"}, json.dumps({"@type": "NewsArticle", "headline": "EV sales surge"})),
+         _next_data(3), _next_data(3)],
+        [FakeTag({"property": "og:title", "content": "EV sales surge"})]
+    )
+    text = extract_embedded_text(soup)
+    assert text.split("\n\n") == ["EV sales surge"] + [_sentence(i) for i in range(3)]
+
+
+def test_collection_stops_at_max_chars():
+    text = extract_embedded_text(FakeSoup([_next_data(500)]), max_chars=1000)
+    assert 1000 <= len(text) < 1000 + len(_sentence(499)) + 2
+    assert text.startswith(_sentence(0))
+
+
+def test_many_distinct_strings_are_linear():
+    soup = FakeSoup([_next_data(1900)])
+    started = time.perf_counter()
+    text = extract_embedded_text(soup)
+    assert time.perf_counter() - started < 0.5
+    assert text.count("\n\n") == 1899
@@ -0,0 +1,51 @@
+"""
+Regression test for the import-time budget of ``agent.summarizer``.
+
+Imports run in fresh interpreters so earlier tests cannot pre-load modules.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget from the README; override on slow CI machines with IMPORT_BUDGET_MS
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "50"))
+
+HEAVY_MODULES = ("langchain", "langchain_core", "langchain_google_genai", "bs4", "httpx")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import agent.summarizer
+elapsed = time.perf_counter() - started
+agent.summarizer.WebpageSummarizer(api_key="test")
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def _probe():
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_import_is_within_budget():
+    # Best of several runs, to ignore scheduling noise
+    best = min(_probe()["ms"] for _ in range(5))
+    assert best <= IMPORT_BUDGET_MS, f"import agent.summarizer took {best:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+def test_import_and_construction_skip_heavy_and_optional_modules():
+    modules = set(_probe()["modules"])
+    assert not modules & set(HEAVY_MODULES)
+    for optional in ("agent.dedup", "agent.degraded", "agent.incremental", "agent.prefetch", "concurrent.futures"):
+        assert optional not in modules
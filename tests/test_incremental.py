@@ -0,0 +1,41 @@
+"""
+Tests for incremental re-summarization.
+"""
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from agent.incremental import SectionStore
+from agent.summarizer import WebpageSummarizer
+
+
+def _page(sentences):
+    return " ".join(sentences)
+
+
+def test_updates_of_long_pages_stay_on_the_summary_model(tmp_path):
+    summarizer = WebpageSummarizer(
+        "test-key",
+        model="large-model",
+        fallback_model="small-model",
+        short_page_chars=4000,
+        section_store=SectionStore(str(tmp_path)),
+        llm_factory=lambda api_key, model: model
+    )
+    calls = []
+
+    def run(task, prompt, content_chars=None, **inputs):
+        calls.append((task, summarizer.router.model_for(task, content_chars)))
+        return "summary"
+
+    summarizer.router.run = run
+
+    sentences = [f"Sentence number {i} talks about markets in some detail." for i in range(400)]
+    summarizer.summarize_content("https://example.com/a", _page(sentences))
+    added = [f"Brand new sentence {i} appears right here now." for i in range(25)]
+    result = summarizer.summarize_content("https://example.com/a", _page(sentences + added))
+
+    assert result["refresh"] == "updated"
+    # The diff is far below SHORT_PAGE_CHARS, but the page is not
+    assert calls[-2] == ("summarize", "large-model")
@@ -0,0 +1,104 @@
+"""
+Tests for the load-test step runner.
+"""
+
+import asyncio
+import random
+import time
+
+from agent.loadtest import find_saturation, run_step
+
+
+class Response:
+    status_code = 200
+
+
+class BlockingClient:
+    """Client whose first request blocks the event loop, delaying later arrivals."""
+
+    def __init__(self, block=0.5):
+        self.block = block
+
+    async def post(self, path, json=None, timeout=None):
+        if self.block:
+            block, self.block = self.block, 0
+            time.sleep(block)
+        return Response()
+
+
+class SlowClient:
+    """Client for a healthy server that answers every request in ``latency`` seconds."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def post(self, path, json=None, timeout=None):
+        await asyncio.sleep(self.latency)
+        return Response()
+
+
+class HangingClient:
+    """Client whose requests never complete."""
+
+    def __init__(self):
+        self.cancelled = 0
+
+    async def post(self, path, json=None, timeout=None):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def _run(client, **overrides):
+    options = dict(
+        rate=50.0, duration=1.0, page_urls=["http://pages/1"], questions=["Why?"], ask_ratio=0.0,
+        max_outstanding=1000, request_timeout=0.2, rng=random.Random(1)
+    )
+    options.update(overrides)
+
+    async def step():
+        result = await run_step(client, **options)
+        # Read before asyncio.run() cancels leftover tasks on exit
+        result["cancelled"] = getattr(client, "cancelled", 0)
+        return result
+
+    return asyncio.run(step())
+
+
+def test_latency_is_measured_from_the_scheduled_arrival():
+    step = _run(BlockingClient(block=0.5))
+    # Requests due while the loop was blocked waited for it; that delay counts
+    assert step["p95"] >= 0.2
+    assert step["error_rate"] == 0.0
+
+
+def test_requests_outliving_the_timeout_are_cancelled():
+    client = HangingClient()
+    step = _run(client, rate=20.0, duration=0.3)
+    assert step["sent"] > 0
+    assert step["cancelled"] == step["sent"]
+    assert step["error_rate"] == 1.0
+
+
+def _step(rate, offered_rate, throughput, p95=0.5, error_rate=0.0):
+    return {"rate": rate, "offered_rate": offered_rate, "throughput": throughput, "p95": p95, "error_rate": error_rate}
+
+
+def test_healthy_server_is_never_reported_saturated():
+    # The same load as 2 req/s for 5 s against 0.3 s responses, ten times faster
+    for seed in range(12):
+        step = _run(SlowClient(0.03), rate=20.0, duration=0.5, request_timeout=1.0, rng=random.Random(seed))
+        assert find_saturation([step], slo_p95=0.2, max_error_rate=0.01) == (20.0, None), (seed, step)
+
+
+def test_find_saturation_compares_throughput_with_offered_load():
+    # Fewer arrivals than nominal, all served: sustained
+    steps = [_step(1, 0.8, 0.8), _step(10, 9.05, 9.0)]
+    assert find_saturation(steps, slo_p95=2.0, max_error_rate=0.01) == (10, None)
+
+    # Throughput falling behind what was offered, latency or errors over budget: saturated
+    assert find_saturation([_step(1, 1.0, 1.0), _step(5, 5.2, 4.0)], 2.0, 0.01) == (1, 5)
+    assert find_saturation([_step(1, 1.0, 1.0), _step(5, 5.0, 5.0, p95=3.0)], 2.0, 0.01) == (1, 5)
+    assert find_saturation([_step(1, 1.0, 1.0, error_rate=0.05)], 2.0, 0.01) == (None, 1)
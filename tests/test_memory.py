@@ -0,0 +1,72 @@
+"""
+Tests for the global session memory budget.
+"""
+
+import gc
+import os
+
+import pytest
+
+from agent import memory
+from agent.memory import SummarizerMemory, get_memory_budget_usage, set_memory_budget
+
+
+@pytest.fixture
+def budget():
+    gc.collect()
+    previous = (memory._budget.max_bytes, memory._budget.compress_ratio)
+    yield set_memory_budget
+    set_memory_budget(*previous)
+
+
+def _compressible(i, kb):
+    return f"Session {i} summary about battery prices and charging networks. " * (kb * 16)
+
+
+def _random_text(kb):
+    # Hex of random bytes; zlib only gets it down to about half
+    return os.urandom(kb * 512).hex()
+
+
+def _session(url, summary):
+    session = SummarizerMemory()
+    session.set_summary(url, summary, "Topic")
+    return session
+
+
+def test_cold_sessions_are_compressed_before_any_eviction(budget):
+    budget(400 * 1024)
+    sessions = [_session(f"https://example.com/{i}", _compressible(i, 20)) for i in range(15)]
+
+    usage = get_memory_budget_usage()
+    assert usage["evictions"] == 0
+    assert usage["total_bytes"] <= 200 * 1024
+    assert sessions[0].memory_usage()["summary_compressed"]
+    assert all(session.current_url for session in sessions)
+    assert sessions[3].get_summary()["summary"] == _compressible(3, 20)
+
+
+def test_least_recently_used_sessions_are_evicted_over_the_hard_cap(budget):
+    budget(400 * 1024)
+    sessions = [_session(f"https://example.com/{i}", _random_text(60)) for i in range(16)]
+
+    usage = get_memory_budget_usage()
+    assert usage["evictions"] > 0
+    assert usage["total_bytes"] <= 400 * 1024
+    assert sessions[0].current_url is None
+    assert sessions[-1].current_url == "https://example.com/15"
+
+
+def test_one_oversized_summary_does_not_wipe_other_sessions(budget):
+    budget(200 * 1024)
+    others = [_session(f"https://example.com/{i}", _compressible(i, 1)) for i in range(50)]
+    evictions = get_memory_budget_usage()["evictions"]
+
+    large = _session("https://example.com/large", _random_text(1024))
+
+    usage = get_memory_budget_usage()
+    assert usage["total_bytes"] <= 200 * 1024
+    assert large.memory_usage()["total_bytes"] <= 100 * 1024
+    assert large.get_summary()["summary"]
+    assert sum(1 for s in others if s.current_url) > 0
+    assert usage["evictions"] - evictions < 50
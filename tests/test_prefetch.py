@@ -0,0 +1,62 @@
+"""
+Tests for link ranking and speculative prefetching.
+"""
+
+from agent import prefetch
+from agent.prefetch import FetchCache, Link, LinkPrefetcher, collect_links, rank_links
+
+PAGE = "https://example.com/news/ev-sales"
+
+
+class FakeAnchor:
+    def __init__(self, href, text, parent=None):
+        self.attrs = {"href": href}
+        self.text = text
+        self.parent = parent
+
+    def __getitem__(self, key):
+        return self.attrs[key]
+
+    def get_text(self, separator="", strip=False):
+        return self.text
+
+    def find_parent(self, names):
+        return self.parent if self.parent in names else None
+
+
+class FakeSoup:
+    def __init__(self, anchors):
+        self.anchors = anchors
+
+    def find_all(self, name, href=False):
+        return self.anchors
+
+
+def test_collect_links_skips_unparseable_urls():
+    soup = FakeSoup([
+        FakeAnchor("http://example.com:99999/", "Battery prices fall again this year"),
+        FakeAnchor("http://example.com:abc/x", "Charging networks expand across regions"),
+        FakeAnchor("/news/battery-prices", "Battery prices fall again this year"),
+    ])
+    links = collect_links(soup, PAGE)
+    assert [link.url for link in links] == ["https://example.com/news/battery-prices"]
+
+
+def test_rank_links_skips_bad_ports():
+    links = [
+        Link("http://example.com:99999/story", "Battery prices fall again this year", False),
+        Link("https://example.com/news/charging", "Charging networks expand across regions", False),
+    ]
+    assert rank_links(links, PAGE, "battery charging") == ["https://example.com/news/charging"]
+
+
+def test_prefetch_is_best_effort(monkeypatch):
+    def broken(*args, **kwargs):
+        raise ValueError("Port out of range 0-65535")
+
+    monkeypatch.setattr(prefetch, "rank_links", broken)
+    prefetcher = LinkPrefetcher(cache=FetchCache())
+    links = [Link("http://example.com:99999/", "Battery prices fall again this year", False)]
+
+    assert prefetcher.prefetch(None, PAGE, links) == []
+    assert prefetcher.usage()["failed"] == 1
@@ -0,0 +1,46 @@
+"""
+Tests for prompt token budgeting.
+"""
+
+import time
+
+from agent.tokens import TRUNCATION_MARKER, count_tokens, pack_sections, truncate_to_tokens
+
+
+def test_short_text_is_returned_unchanged():
+    text = "A short page about nothing much."
+    assert truncate_to_tokens(text, 100) is text
+
+
+def test_truncation_fits_budget_and_ends_on_a_word():
+    text = " ".join(f"word{i}, and punctuation!" for i in range(5000))
+    for budget in (20, 100, 1000, 4000):
+        truncated = truncate_to_tokens(text, budget)
+        assert truncated.endswith(TRUNCATION_MARKER)
+        assert count_tokens(truncated) <= budget
+        body = truncated[:-len(TRUNCATION_MARKER)]
+        assert text.startswith(body) and text[len(body)] == " "
+        # Nearly the whole budget is used
+        assert count_tokens(truncated) >= budget * 0.9
+
+
+def test_long_words_are_bounded_by_characters():
+    text = " ".join("x" * 37 for _ in range(2000))
+    truncated = truncate_to_tokens(text, 500)
+    assert count_tokens(truncated) <= 500
+    assert len(truncated) >= 450 * 4
+
+
+def test_truncating_a_huge_page_only_scans_the_budget():
+    text = "lorem ipsum dolor sit amet. " * 100_000
+    started = time.perf_counter()
+    truncate_to_tokens(text, 12_000)
+    assert time.perf_counter() - started < 0.1
+
+
+def test_pack_sections_truncates_the_first_section_that_does_not_fit():
+    sections = ["alpha beta gamma " * 20, "delta epsilon " * 200]
+    packed = pack_sections(sections, 200)
+    assert packed[0] == sections[0]
+    assert packed[1].endswith(TRUNCATION_MARKER)
+    assert count_tokens("\n\n".join(packed)) <= 200